@@ -0,0 +1,205 @@
+"""
+Скрипт пакетного парсинга нескольких категорий vseinstrumenti.ru.
+Этот скрипт:
+- Принимает список URL категорий или файл со списком (один URL на строку, # - комментарий).
+- Запускает один общий пул загрузчиков и пул процессов парсинга на весь пакет, а в режиме --details -
+  общий загрузчик детальных страниц, чтобы товар из нескольких категорий загружался один раз.
+- Обрабатывает несколько категорий одновременно, чтобы пул не простаивал между категориями.
+- Соблюдает общий лимит частоты запросов и лимит одновременных запросов к хосту.
+- При записи в общий файл или с индексом повторов (--dedup-index) использует общий индекс повторов,
+  чтобы товар из нескольких пересекающихся категорий выгружался один раз.
+- Записывает отдельный файл для каждой категории или общий файл со столбцом "Категория".
+"""
+
+import argparse
+import asyncio
+import re
+from pathlib import Path
+from urllib.parse import urlparse
+from main import main, add_run_arguments, run_options, export_metrics
+from utils.crawler import FetcherPool, DEFAULT_WORKERS
+from utils.checkpoint import journal_path
+from utils.dedup import DedupIndex
+from utils.details import DetailEnricher, DETAIL_FIELDS, DEFAULT_DETAIL_WORKERS
+from utils.page_cache import PageCache, DEFAULT_CACHE_DIR, DEFAULT_TTL, DEFAULT_MAX_BYTES
+from utils.html_archive import HtmlArchive
+from utils.pipeline import create_parse_executor, DEFAULT_PARSE_WORKERS
+from utils.product_index import STATUS_FIELD
+from utils.rate_limit import AdaptiveRateLimiter, HostLimiter
+from utils.writers import create_writer, resolve_format
+from utils.metrics import metrics, start_metrics_server
+from utils.logger import logger
+
+CATEGORY_FIELD = "Категория"
+DEFAULT_CATEGORY_CONCURRENCY = 2
+
+def read_urls(sources):
+    """
+    Чтение списка URL категорий.
+
+    Аргументы:
+        sources (list): URL категорий и/или пути к файлам со списками URL.
+
+    Возвращает:
+        list: URL категорий без повторов в исходном порядке.
+    """
+    urls = []
+    for source in sources:
+        if Path(source).is_file():
+            lines = Path(source).read_text(encoding="utf-8").splitlines()
+            urls.extend(line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#"))
+        else:
+            urls.append(source)
+    return list(dict.fromkeys(url.split("#")[0] for url in urls))
+
+def category_slug(url):
+    """
+    Короткое имя категории для имени файла: последний сегмент пути URL.
+
+    Аргументы:
+        url (str): URL категории.
+
+    Возвращает:
+        str: Имя категории.
+    """
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    return re.sub(r'[^\w.-]+', "_", segments[-1] if segments else urlparse(url).netloc)
+
+def category_output(output_file, url):
+    """
+    Имя выходного файла категории: <имя>_<категория>.<расширение>.
+
+    Аргументы:
+        output_file (str): Базовое имя выходного файла.
+        url (str): URL категории.
+
+    Возвращает:
+        str: Имя файла категории.
+    """
+    path = Path(output_file)
+    return str(path.with_name(f"{path.stem}_{category_slug(url)}{path.suffix}"))
+
+async def run_batch(urls, max_products=0, output_file="products.xlsx", workers=DEFAULT_WORKERS, fetcher="auto",
+                    engine="auto", parse_workers=DEFAULT_PARSE_WORKERS, output_format=None, resume=False,
+                    cache_dir=None, cache_ttl=DEFAULT_TTL, cache_max_bytes=DEFAULT_MAX_BYTES, cache_compress=False,
+                    offline=False, delta_index=None, details=False, detail_workers=DEFAULT_DETAIL_WORKERS,
+                    metrics_json=None, metrics_prom=None, dedup_index=None, archive_dir=None, merge=False, rate=None, host_limit=None, category_concurrency=DEFAULT_CATEGORY_CONCURRENCY):
+    """
+    Пакетный парсинг категорий на общем пуле загрузки.
+
+    Аргументы:
+        urls (list): URL категорий.
+        max_products (int): Максимальное количество товаров в каждой категории (0 для всех).
+        output_file (str): Имя выходного файла (общего или базового для файлов категорий).
+        merge (bool): Записывать все категории в один файл.
+        rate (float): Общий лимит запросов в секунду; фактическая частота снижается,
+            если сайт ограничивает запросы (None - адаптивная частота по умолчанию).
+        host_limit (int): Лимит одновременных запросов к одному хосту (None - без лимита).
+        category_concurrency (int): Количество одновременно обрабатываемых категорий.
+        Остальные аргументы соответствуют функции main.
+
+    Возвращает:
+        dict: URL категории -> количество товаров (None, если категория завершилась ошибкой).
+    """
+    output_format = resolve_format(output_file, output_format)
+    metrics.reset()
+    if offline and not cache_dir:
+        cache_dir = DEFAULT_CACHE_DIR
+    cache = PageCache(cache_dir, cache_ttl, cache_max_bytes, cache_compress) if cache_dir else None
+    archive = HtmlArchive(archive_dir) if archive_dir else None
+    pool = FetcherPool(
+        workers, fetcher, cache=cache, offline=offline, archive=archive,
+        rate_limiter=AdaptiveRateLimiter(rate, max_rate=rate) if rate else None,
+        host_limiter=HostLimiter(host_limit) if host_limit else None,
+    )
+    executor = create_parse_executor(parse_workers)
+    enricher = DetailEnricher(pool, detail_workers, base_url=urls[0]) if details and urls else None
+    # Без общего файла и индекса повторов каждая категория выгружается полностью
+    dedup = DedupIndex(dedup_index) if merge or dedup_index else None
+    writer = None
+    if merge:
+        extra_fields = (DETAIL_FIELDS if enricher else ()) + (CATEGORY_FIELD,) + ((STATUS_FIELD,) if delta_index else ())
+        writer = create_writer(output_file, output_format, extra_fields)
+    semaphore = asyncio.Semaphore(max(1, category_concurrency))
+    results = {}
+    failed_pages = []
+
+    async def run_category(url):
+        async with semaphore:
+            target = output_file if merge else category_output(output_file, url)
+            try:
+                results[url] = await main(
+                    url, max_products, output_file=target, engine=engine, output_format=output_format,
+                    resume=resume, journal_file=journal_path(category_output(output_file, url)),
+                    delta_index=delta_index, pool=pool, parse_executor=executor, writer=writer, enricher=enricher,
+                    dedup=dedup, failed_pages=failed_pages,
+                    row_extra={CATEGORY_FIELD: url} if merge else None,
+                )
+            except Exception as e:
+                logger.error(f"Ошибка парсинга категории {url}: {str(e)}")
+                results[url] = None
+
+    logger.info(f"Пакетный парсинг: категорий {len(urls)}, загрузчиков {workers}")
+    try:
+        await pool.start()
+        await asyncio.gather(*(run_category(url) for url in urls))
+        # Индекс сохраняется, только если все категории обработаны полностью: иначе повторный запуск
+        # (в том числе с --resume) отбросил бы их товары как уже выгруженные
+        if dedup and not failed_pages and all(count is not None for count in results.values()):
+            dedup.commit()
+        elif dedup:
+            logger.warning("Индекс повторов не сохранен: не все страницы загружены")
+    finally:
+        await pool.close()
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if dedup:
+            dedup.log_stats()
+        if enricher:
+            enricher.log_stats()
+            enricher.close()
+        if writer:
+            writer.close()
+        if cache:
+            cache.log_stats()
+        if archive:
+            archive.close()
+            archive.log_stats()
+        export_metrics(metrics_json, metrics_prom)
+
+    failed = [url for url, count in results.items() if count is None]
+    logger.info(
+        f"Пакетный парсинг завершен: категорий {len(urls) - len(failed)} из {len(urls)}, "
+        f"товаров {sum(count or 0 for count in results.values())}"
+    )
+    for url in failed:
+        logger.warning(f"Категория не обработана: {url}")
+    return results
+
+def parse_args():
+    """
+    Разбор аргументов командной строки.
+
+    Возвращает:
+        argparse.Namespace: Аргументы запуска.
+    """
+    parser = argparse.ArgumentParser(description="Пакетный парсер категорий vseinstrumenti.ru")
+    parser.add_argument("sources", nargs="+", help="URL категорий и/или файлы со списками URL")
+    parser.add_argument("--merge", action="store_true", help="Записать все категории в один файл")
+    parser.add_argument("--rate", type=float, help="Общий лимит запросов в секунду")
+    parser.add_argument("--host-limit", type=int, help="Лимит одновременных запросов к одному хосту")
+    parser.add_argument(
+        "--categories", type=int, default=DEFAULT_CATEGORY_CONCURRENCY,
+        help="Количество одновременно обрабатываемых категорий",
+    )
+    add_run_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    asyncio.run(run_batch(
+        read_urls(args.sources), args.max_products, merge=args.merge, rate=args.rate,
+        host_limit=args.host_limit, category_concurrency=args.categories, **run_options(args),
+    ))
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Бенчмарк бэкендов загрузки страниц на локальном сервере с фикстурами.
+Этот модуль:
+- Запускает FixtureServer с заданным количеством страниц.
+- Обходит все страницы каждым бэкендом через пул загрузки и измеряет страницы в секунду.
+- Пропускает бэкенд Selenium, если браузер не удалось запустить.
+
+Запуск: python -m benchmarks.bench_fetch --pages 40 --workers 4
+"""
+
+import argparse
+import asyncio
+import time
+from contextlib import aclosing
+from benchmarks.fixture_server import FixtureServer
+from utils.crawler import FetcherPool, crawl_pages
+
+
+async def run_backend(backend, url, pages, workers):
+    """
+    Обход всех страниц одним бэкендом.
+
+    Возвращает:
+        tuple: Количество загруженных страниц и время в секундах.
+    """
+    pool = FetcherPool(workers, backend, delay=0)
+    try:
+        await pool.start()
+        started = time.perf_counter()
+        loaded = 0
+        async with aclosing(crawl_pages(pool, url, pages)) as results:
+            async for _ in results:
+                loaded += 1
+        return loaded, time.perf_counter() - started
+    finally:
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк бэкендов загрузки страниц")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backends", nargs="+", default=["http", "selenium"])
+    args = parser.parse_args()
+
+    with FixtureServer(pages=args.pages) as server:
+        for backend in args.backends:
+            try:
+                loaded, elapsed = asyncio.run(run_backend(backend, server.url, args.pages, args.workers))
+            except Exception as e:
+                print(f"{backend:>10}: пропущен ({e})")
+                continue
+            print(f"{backend:>10}: {loaded} страниц за {elapsed:.2f} с, {loaded / elapsed:.1f} стр/с")
+
+
+if __name__ == "__main__":
+    main()
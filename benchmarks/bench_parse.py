@@ -0,0 +1,74 @@
+"""
+Микробенчмарк движков извлечения товаров на сохраненных HTML-фикстурах.
+Этот модуль:
+- Проверяет, что все установленные движки возвращают те же данные, что и эталонный bs4.
+- Измеряет скорость извлечения (карточек в секунду) для каждого движка.
+- Завершается с ненулевым кодом, если результаты движков расходятся.
+
+Запуск: python -m benchmarks.bench_parse --pages 50
+"""
+
+import argparse
+import sys
+import time
+from benchmarks.fixture_server import FIXTURES_DIR, CATEGORY_FIXTURE, render_page
+from utils.extractors import EXTRACTORS
+
+
+def check_parity():
+    """
+    Сравнение результатов всех движков с эталонным на всех фикстурах.
+
+    Возвращает:
+        list: Описания найденных расхождений.
+    """
+    mismatches = []
+    for fixture in sorted(FIXTURES_DIR.glob("*.html")):
+        html = fixture.read_text(encoding="utf-8")
+        expected = EXTRACTORS["bs4"](html)
+        for name, extractor in EXTRACTORS.items():
+            if extractor is None or name == "bs4":
+                continue
+            actual = extractor(html)
+            if actual != expected:
+                mismatches.append(f"{fixture.name}: {name} расходится с bs4")
+    return mismatches
+
+
+def bench(extractor, pages, repeat):
+    """
+    Возвращает:
+        float: Количество карточек в секунду (лучший из повторов).
+    """
+    best = float('inf')
+    tiles = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        tiles = sum(len(extractor(html)) for html in pages)
+        best = min(best, time.perf_counter() - started)
+    return tiles / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк движков извлечения товаров")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    mismatches = check_parity()
+    for mismatch in mismatches:
+        print(f"РАСХОЖДЕНИЕ: {mismatch}")
+
+    template = CATEGORY_FIXTURE.read_text(encoding="utf-8")
+    pages = [render_page(template, page_num) for page_num in range(1, args.pages + 1)]
+    for name, extractor in EXTRACTORS.items():
+        if extractor is None:
+            print(f"{name:>10}: не установлен")
+            continue
+        print(f"{name:>10}: {bench(extractor, pages, args.repeat):,.0f} карточек/с")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Набор офлайн-бенчмарков для сравнения версий парсера.
+Этот модуль:
+- Масштабирует сохраненную страницу категории до заданного количества карточек (10-100 тыс.).
+- Измеряет скорость извлечения карточек каждым установленным движком.
+- Измеряет сквозную скорость парсинга (страниц и товаров в секунду) функцией main на локальном
+  FixtureServer для каждого выходного формата и пиковую память (RSS) процесса парсинга.
+  Каждый формат запускается в отдельном процессе, чтобы пиковая память не накапливалась между ними.
+- Сохраняет результаты в benchmarks/results/<метка>.json и сравнивает их с предыдущими результатами,
+  отмечая регрессии сверх заданного порога.
+
+Запуск: python -m benchmarks.bench_suite --tiles 10000 100000
+Сравнение: python -m benchmarks.bench_suite --compare benchmarks/results/old.json benchmarks/results/new.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.bench_parse import bench
+from benchmarks.fixture_server import CATEGORY_FIXTURE, FixtureServer, render_page
+from utils.extractors import EXTRACTORS, DEFAULT_PAGE_SIZE
+from utils.writers import WRITERS
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_TILES = (10_000,)
+DEFAULT_THRESHOLD = 0.1
+
+
+def git_label():
+    """
+    Метка версии для имени файла результатов.
+
+    Возвращает:
+        str: Результат git describe или "local", если git недоступен.
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def peak_rss_mb():
+    """
+    Пиковая память текущего процесса.
+
+    Возвращает:
+        float: Пиковый RSS в МБ или None, если его нельзя определить.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # В macOS ru_maxrss в байтах, в Linux - в килобайтах
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        peak = getattr(psutil.Process().memory_info(), "peak_wset", None)
+        return peak / 1024 / 1024 if peak else None
+    return None
+
+
+def bench_parse(tiles, repeat, engines=None):
+    """
+    Скорость извлечения карточек каждым движком.
+
+    Аргументы:
+        tiles (int): Количество карточек.
+        repeat (int): Количество повторов (берется лучший).
+        engines (list): Движки для измерения (None - все установленные).
+
+    Возвращает:
+        dict: Название метрики -> карточек в секунду.
+    """
+    template = CATEGORY_FIXTURE.read_text(encoding="utf-8")
+    pages = [render_page(template, page_num) for page_num in range(1, -(-tiles // DEFAULT_PAGE_SIZE) + 1)]
+    results = {}
+    for name, extractor in EXTRACTORS.items():
+        if extractor is not None and (not engines or name in engines):
+            results[f"parse.{name}.tiles_per_second"] = round(bench(extractor, pages, repeat), 1)
+    return results
+
+
+async def run_export(url, tiles, output_file, output_format, workers, engine):
+    """
+    Сквозной парсинг категории с записью в файл.
+
+    Возвращает:
+        dict: Количество страниц и товаров, время и пиковая память.
+    """
+    from main import main
+    from utils.crawler import FetcherPool
+    from utils.metrics import metrics
+
+    # Без задержки между запросами: измеряется скорость парсера, а не лимит частоты
+    pool = FetcherPool(workers, "http", delay=0)
+    try:
+        await pool.start()
+        started = time.perf_counter()
+        products = await main(
+            url, tiles, output_file=output_file, engine=engine, output_format=output_format, pool=pool,
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        await pool.close()
+    return {
+        "pages": metrics.counters["pages_fetched"],
+        "products": products,
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _export_process(queue, *args):
+    from utils.logger import logger
+    logger.setLevel(logging.WARNING)
+    try:
+        queue.put(asyncio.run(run_export(*args)))
+    except Exception as e:
+        queue.put({"error": str(e)})
+
+
+def bench_export(url, tiles, output_format, workers, engine):
+    """
+    Сквозная скорость парсинга и пиковая память в отдельном процессе.
+
+    Аргументы:
+        url (str): URL категории на FixtureServer.
+        tiles (int): Количество карточек.
+        output_format (str): Формат выходного файла.
+        workers (int): Количество загрузчиков.
+        engine (str): Движок извлечения товаров.
+
+    Возвращает:
+        dict: Название метрики -> значение.
+
+    Исключения:
+        RuntimeError: Если парсинг завершился ошибкой.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, f"products.{output_format}")
+        process = context.Process(
+            target=_export_process, args=(queue, url, tiles, output_file, output_format, workers, engine),
+        )
+        process.start()
+        result = queue.get()
+        process.join()
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    if result["products"] < tiles:
+        raise RuntimeError(f"спарсено {result['products']} товаров из {tiles}")
+    prefix = f"export.{output_format}"
+    results = {
+        f"{prefix}.pages_per_second": round(result["pages"] / result["seconds"], 2),
+        f"{prefix}.products_per_second": round(result["products"] / result["seconds"], 1),
+    }
+    if result["peak_rss_mb"] is not None:
+        results[f"{prefix}.peak_rss_mb"] = round(result["peak_rss_mb"], 1)
+    return results
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """
+    Сравнение результатов двух запусков.
+
+    Аргументы:
+        old (dict): Предыдущие результаты.
+        new (dict): Новые результаты.
+        threshold (float): Допустимое ухудшение (0.1 - 10%).
+
+    Возвращает:
+        list: Описания регрессий.
+    """
+    regressions = []
+    print(f"Сравнение {old['label']} -> {new['label']}")
+    for tiles, metrics in new["results"].items():
+        for name, value in metrics.items():
+            previous = old["results"].get(tiles, {}).get(name)
+            if not previous:
+                continue
+            change = (value - previous) / previous
+            # Для памяти ухудшение - рост, для скорости - снижение
+            worse = change > threshold if name.endswith("_mb") else change < -threshold
+            mark = "  РЕГРЕССИЯ" if worse else ""
+            print(f"{tiles:>7} {name:<40} {previous:>12,.1f} -> {value:>12,.1f} ({change:+.1%}){mark}")
+            if worse:
+                regressions.append(f"{tiles} {name}: {change:+.1%}")
+    return regressions
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def latest_results(results_dir, exclude=None):
+    """
+    Возвращает:
+        Path: Последний по времени файл результатов (None, если их нет).
+    """
+    files = [path for path in Path(results_dir).glob("*.json") if path != exclude]
+    return max(files, key=lambda path: path.stat().st_mtime) if files else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Набор офлайн-бенчмарков парсера")
+    parser.add_argument("--tiles", type=int, nargs="+", default=list(DEFAULT_TILES), help="Количество карточек")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--engine", default="auto", help="Движок извлечения для сквозного парсинга")
+    parser.add_argument("--engines", nargs="+", help="Движки для бенчмарка извлечения (по умолчанию все)")
+    parser.add_argument("--formats", nargs="+", default=list(WRITERS))
+    parser.add_argument("--label", help="Метка результатов (по умолчанию git describe)")
+    parser.add_argument("--results-dir", default=str(RESULTS_DIR))
+    parser.add_argument("--baseline", help="Файл результатов для сравнения (по умолчанию последний сохраненный)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Допустимое ухудшение, доля")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Только сравнить два файла результатов")
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    label = args.label or git_label()
+    results = {}
+    for tiles in args.tiles:
+        scale = results.setdefault(str(tiles), {})
+        scale.update(bench_parse(tiles, args.repeat, args.engines))
+        with FixtureServer(pages=-(-tiles // DEFAULT_PAGE_SIZE)) as server:
+            for output_format in args.formats:
+                try:
+                    scale.update(bench_export(server.url, tiles, output_format, args.workers, args.engine))
+                except Exception as e:
+                    print(f"{tiles:>7} export.{output_format}: пропущен ({e})")
+        for name, value in scale.items():
+            print(f"{tiles:>7} {name:<40} {value:>12,.1f}")
+
+    report = {
+        "label": label,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    results_dir = Path(args.results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    path = results_dir / f"{label}.json"
+    baseline = Path(args.baseline) if args.baseline else latest_results(results_dir, exclude=path)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены: {path}")
+
+    if baseline is None:
+        return
+    regressions = compare(load_results(baseline), report, args.threshold)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Бенчмарк форматов выходных файлов.
+Этот модуль:
+- Готовит заданное количество товаров из HTML-фикстуры категории.
+- Записывает их постранично (по 40 товаров) каждым форматом.
+- Сравнивает время записи и размер получившегося файла.
+
+Запуск: python -m benchmarks.bench_writers --rows 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from benchmarks.fixture_server import CATEGORY_FIXTURE, render_page
+from utils.extractors import extract_products
+from utils.writers import WRITERS, create_writer
+
+PAGE_SIZE = 40
+
+
+def make_products(rows):
+    """
+    Возвращает:
+        list: Список записей о товарах (Product) длиной rows.
+    """
+    template = CATEGORY_FIXTURE.read_text(encoding="utf-8")
+    products = []
+    page_num = 1
+    while len(products) < rows:
+        products.extend(extract_products(render_page(template, page_num)))
+        page_num += 1
+    return products[:rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк форматов выходных файлов")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--formats", nargs="+", default=list(WRITERS))
+    args = parser.parse_args()
+
+    products = make_products(args.rows)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for output_format in args.formats:
+            filename = os.path.join(tmp_dir, f"products.{output_format}")
+            started = time.perf_counter()
+            try:
+                with create_writer(filename, output_format) as writer:
+                    for start in range(0, len(products), PAGE_SIZE):
+                        writer.write_rows(products[start:start + PAGE_SIZE])
+            except ValueError as e:
+                print(f"{output_format:>8}: пропущен ({e})")
+                continue
+            elapsed = time.perf_counter() - started
+            size_mb = os.path.getsize(filename) / 1024 / 1024
+            print(f"{output_format:>8}: {elapsed:6.2f} с, {size_mb:7.2f} МБ, {len(products) / elapsed:,.0f} строк/с")
+
+
+if __name__ == "__main__":
+    main()
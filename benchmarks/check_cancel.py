@@ -0,0 +1,113 @@
+"""
+Проверка остановки конвейера парсинга на сохраненных HTML-фикстурах.
+Этот модуль:
+- Проверяет, что parse_pages закрывается, если потребитель прекращает чтение раньше конца страниц,
+  а очередь страниц заполнена (остановка по лимиту товаров, ошибка записи).
+- Проверяет, что отмена main завершается за ограниченное время, в том числе при продолжении
+  по журналу (кнопка отмены в GUI, отмена задания сервиса, Ctrl+C).
+- Завершается с ненулевым кодом, если остановка зависла.
+
+Запуск: python -m benchmarks.check_cancel
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+from benchmarks.fixture_server import FixtureServer
+from main import main
+from utils.pipeline import parse_pages
+
+TIMEOUT = 10
+
+
+class CancelAfter:
+    """
+    Обработчик прогресса, сообщающий о достижении заданного количества товаров.
+    """
+    def __init__(self, products):
+        self.products = products
+        self.done = 0
+        self.reached = asyncio.Event()
+
+    def set_total(self, total):
+        pass
+
+    def update(self, n=1):
+        self.done += n
+        if self.done >= self.products:
+            self.reached.set()
+
+
+async def check_early_break(pages=99, queue_size=2):
+    """
+    Возвращает:
+        str: Описание проблемы или None.
+    """
+    async def parsed_pages():
+        for page_num in range(1, pages + 1):
+            yield page_num, []
+
+    stream = parse_pages(parsed_pages(), queue_size=queue_size)
+    async for page_num, _ in stream:
+        if page_num == 2:
+            break
+    try:
+        await asyncio.wait_for(stream.aclose(), TIMEOUT)
+    except asyncio.TimeoutError:
+        return f"parse_pages не закрылся за {TIMEOUT} с после остановки потребителя"
+    return None
+
+
+async def cancel_after(coro, products):
+    """
+    Запуск main с отменой после заданного количества товаров.
+
+    Возвращает:
+        bool: True, если main завершился за TIMEOUT после отмены.
+    """
+    progress = CancelAfter(products)
+    task = asyncio.create_task(coro(progress))
+    await asyncio.wait({task, asyncio.create_task(progress.reached.wait())}, return_when=asyncio.FIRST_COMPLETED)
+    task.cancel()
+    done, _ = await asyncio.wait({task}, timeout=TIMEOUT)
+    return bool(done)
+
+
+async def check_cancel_main(pages=200):
+    """
+    Возвращает:
+        str: Описание проблемы или None.
+    """
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer(pages=pages) as server:
+        output_file = str(Path(tmp) / "products.csv")
+
+        def run(resume):
+            return lambda progress: main(
+                server.url, progress_handler=progress, output_file=output_file, fetcher="http",
+                parse_workers=0, resume=resume,
+            )
+
+        # Прерванный запуск оставляет журнал; при --resume записанные страницы подаются в очередь
+        # без ожидания и заполняют ее раньше, чем потребитель успевает их прочитать
+        if not await cancel_after(run(False), products=pages * 20):
+            return f"main не завершился за {TIMEOUT} с после отмены"
+        if not await cancel_after(run(True), products=pages * 5):
+            return f"main с --resume не завершился за {TIMEOUT} с после отмены"
+    return None
+
+
+async def run_checks():
+    problems = [problem for problem in (await check_early_break(), await check_cancel_main()) if problem]
+    for problem in problems:
+        print(f"ЗАВИСАНИЕ: {problem}")
+    if not problems:
+        print("Остановка конвейера: OK")
+    sys.stdout.flush()
+    # Без ожидания зависших задач: asyncio.run ждал бы их бесконечно
+    os._exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_checks())
@@ -0,0 +1,192 @@
+"""
+Локальный HTTP-сервер с сохраненными страницами категории для офлайн-бенчмарков.
+Этот модуль:
+- Отдает страницы категории /category/<slug>/ и /category/<slug>/pageN/ из HTML-фикстуры.
+- Делает артикулы уникальными для каждой страницы, чтобы страницы не повторялись.
+- Указывает в счетчике товаров количество, соответствующее заданному количеству страниц.
+- Отдает детальные страницы товаров /product/item-<артикул>/ из фикстуры товара.
+- Сжимает ответы gzip или brotli в зависимости от заголовка Accept-Encoding и хранит сжатые
+  страницы категории, чтобы сервер не ограничивал скорость бенчмарка на десятках тысяч карточек.
+- Возвращает 404 для страниц за пределами заданного количества.
+- Может имитировать ограничение запросов: отвечать заданным статусом (например, 429)
+  на первые запросы к выбранным страницам.
+"""
+
+import gzip
+import re
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+CATEGORY_FIXTURE = FIXTURES_DIR / "category_page.html"
+PRODUCT_FIXTURE = FIXTURES_DIR / "product_page.html"
+CATEGORY_PATH = "/category/perforatory-32/"
+
+_CODE_RE = re.compile(r'(Код: |item-|data-product-id=")(\d+)')
+_PAGE_RE = re.compile(r'^/category/[^/]+/(?:page(\d+)/)?$')
+_PRODUCT_RE = re.compile(r'^/product/item-(\d+)/$')
+_PRODUCT_CODE_RE = re.compile(r'(Код: |"sku": "|goods/)1000000')
+_COUNT_RE = re.compile(r'(data-qa="category-products-count"[^>]*>)[^<]*<')
+
+
+def render_page(template, page_num, pages=None):
+    """
+    Подготовка страницы категории с уникальными для номера страницы артикулами.
+
+    Аргументы:
+        template (str): HTML-код фикстуры.
+        page_num (int): Номер страницы (начиная с 1).
+        pages (int): Количество страниц категории для счетчика товаров (None - как в фикстуре).
+
+    Возвращает:
+        str: HTML-код страницы.
+    """
+    offset = (page_num - 1) * 10_000_000
+    html = _CODE_RE.sub(lambda m: f"{m.group(1)}{int(m.group(2)) + offset}", template)
+    if pages is not None:
+        count = pages * html.count('data-qa="products-tile"')
+        html = _COUNT_RE.sub(lambda m: f"{m.group(1)}Найдено {count} товаров<", html, count=1)
+    return html
+
+
+def encode_body(body, accept):
+    """
+    Сжатие ответа в зависимости от заголовка Accept-Encoding.
+
+    Аргументы:
+        body (bytes): Тело ответа.
+        accept (str): Значение заголовка Accept-Encoding.
+
+    Возвращает:
+        tuple: Тело ответа и значение Content-Encoding (None - без сжатия).
+    """
+    if brotli and "br" in accept:
+        return brotli.compress(body, quality=5), "br"
+    if "gzip" in accept:
+        return gzip.compress(body, compresslevel=6), "gzip"
+    return body, None
+
+
+def render_product(template, code):
+    """
+    Подготовка детальной страницы товара с заданным артикулом.
+
+    Аргументы:
+        template (str): HTML-код фикстуры товара.
+        code (str): Артикул товара.
+
+    Возвращает:
+        str: HTML-код страницы.
+    """
+    return _PRODUCT_CODE_RE.sub(lambda m: f"{m.group(1)}{code}", template)
+
+
+class FixtureServer:
+    """
+    HTTP-сервер с фикстурами, работающий в фоновом потоке.
+    Используется как контекстный менеджер.
+    """
+    def __init__(self, pages=10, template=None, host="127.0.0.1", port=0, failures=None, failure_status=429):
+        """
+        Аргументы:
+            pages (int): Количество страниц категории.
+            template (str): HTML-код фикстуры (по умолчанию CATEGORY_FIXTURE).
+            failures (dict): Номер страницы -> количество первых запросов, на которые отвечать ошибкой.
+            failure_status (int): HTTP-статус ошибки.
+        """
+        self.pages = pages
+        self.product_template = PRODUCT_FIXTURE.read_text(encoding="utf-8")
+        self.product_requests = 0
+        self.failures = dict(failures or {})
+        self.failure_status = failure_status
+        self.template = template or CATEGORY_FIXTURE.read_text(encoding="utf-8")
+        self.requests = 0
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{CATEGORY_PATH}"
+
+    def page(self, page_num, accept=""):
+        """
+        Возвращает:
+            tuple: Сжатое тело страницы категории и значение Content-Encoding.
+        """
+        with self._lock:
+            cached = self._cache.get((page_num, accept))
+        if cached is None:
+            cached = encode_body(render_page(self.template, page_num, self.pages).encode("utf-8"), accept)
+            with self._lock:
+                self._cache[(page_num, accept)] = cached
+        return cached
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                path = self.path.split("?")[0]
+                product_match = _PRODUCT_RE.match(path)
+                if product_match:
+                    with server._lock:
+                        server.product_requests += 1
+                    self.send_body(render_product(server.product_template, product_match.group(1)).encode("utf-8"))
+                    return
+                match = _PAGE_RE.match(path)
+                page_num = int(match.group(1) or 1) if match else 0
+                if not 1 <= page_num <= server.pages:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                with server._lock:
+                    failing = server.failures.get(page_num, 0) > 0
+                    if failing:
+                        server.failures[page_num] -= 1
+                if failing:
+                    self.send_response(server.failure_status)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_encoded(*server.page(page_num, self.headers.get("Accept-Encoding", "")))
+
+            def send_body(self, body):
+                self.send_encoded(*encode_body(body, self.headers.get("Accept-Encoding", "")))
+
+            def send_encoded(self, body, encoding):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                if encoding:
+                    self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -2,42 +2,167 @@
 Модуль графического интерфейса для парсера vseinstrumenti.ru с использованием PyQt5.
 Этот модуль:
 - Предоставляет удобный интерфейс для ввода URL, максимального количества товаров и имени файла.
-- Отображает прогресс парсинга через прогресс-бар.
-- Показывает статус парсинга и ошибки в текстовом поле.
-- Интегрируется с логикой парсинга через asyncio и qasync.
+- Запускает парсинг в отдельном потоке со своим циклом событий asyncio, чтобы загрузка страниц
+  (в том числе синхронные вызовы Selenium) не блокировала окно.
+- Отображает прогресс парсинга через прогресс-бар и сообщения лога в текстовом поле; и то и другое
+  считывается из потока парсинга по таймеру пакетами, а не по сигналу на каждый товар.
+- Позволяет приостановить, продолжить и отменить парсинг без закрытия приложения.
+- Во время парсинга показывает текущую скорость (товаров и страниц в секунду) и оценку оставшегося времени.
 - Использует темную тему для лучшей читаемости.
 """
 
 import sys
 import asyncio
+import logging
+import threading
+from collections import deque
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QTextEdit, QProgressBar
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QObject
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, QTimer
 from PyQt5 import QtGui
-import qasync
 from main import main
+from utils.crawler import FetcherPool, DEFAULT_WORKERS
+from utils.metrics import metrics
 from utils.logger import logger
 
-class TqdmToProgressBar(QObject):
+# Интервал обновления прогресса и сообщений лога в окне, мс
+REFRESH_INTERVAL = 200
+MAX_LOG_LINES = 500
+CANCEL_TIMEOUT = 10_000
+
+class ProgressCounter:
     """
-    Класс для перенаправления обновлений прогресса на QProgressBar.
+    Счетчик прогресса парсинга (протокол progress_handler: set_total/update), безопасный
+    для вызова из потока парсинга. Окно считывает его по таймеру.
     """
-    progress_updated = pyqtSignal(int)
-    total_updated = pyqtSignal(int)
-
-    def __init__(self, progress_bar):
-        super().__init__()
-        self.progress_bar = progress_bar
-        self.progress_updated.connect(self.progress_bar.setValue)
-        self.total_updated.connect(self.progress_bar.setMaximum)
+    def __init__(self):
+        self.total = 0
+        self.done = 0
+        self._lock = threading.Lock()
 
     def update(self, n=1):
-        self.progress_updated.emit(self.progress_bar.value() + n)
+        with self._lock:
+            self.done += n
 
     def set_total(self, total):
-        self.total_updated.emit(total)
+        with self._lock:
+            self.total = total
+
+    def snapshot(self):
+        """
+        Возвращает:
+            tuple: Количество обработанных товаров и общее количество (0, если неизвестно).
+        """
+        with self._lock:
+            return self.done, self.total
+
+class LogBuffer(logging.Handler):
+    """
+    Буфер сообщений лога для вывода в окне. Хранит не больше MAX_LOG_LINES последних сообщений,
+    чтобы окно не отставало от лога при большом количестве страниц.
+    """
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.setFormatter(logging.Formatter("%(levelname)s - %(message)s"))
+        self._lines = deque(maxlen=MAX_LOG_LINES)
+
+    def emit(self, record):
+        self._lines.append(self.format(record))
+
+    def drain(self):
+        """
+        Возвращает:
+            list: Накопленные сообщения; буфер очищается.
+        """
+        lines = []
+        while self._lines:
+            lines.append(self._lines.popleft())
+        return lines
+
+class ParseWorker(QThread):
+    """
+    Поток парсинга со своим циклом событий asyncio. Пауза и отмена передаются
+    в цикл потока через call_soon_threadsafe.
+    """
+    succeeded = pyqtSignal(int)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, url, max_products, output_file, progress):
+        super().__init__()
+        self.url = url
+        self.max_products = max_products
+        self.output_file = output_file
+        self.progress = progress
+        self._loop = None
+        self._task = None
+        self._pool = None
+        self._cancel_requested = False
+
+    def run(self):
+        try:
+            count = asyncio.run(self._parse())
+        except asyncio.CancelledError:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.succeeded.emit(count)
+
+    async def _parse(self):
+        self._pool = FetcherPool(DEFAULT_WORKERS)
+        self._task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        if self._cancel_requested:
+            raise asyncio.CancelledError
+        metrics.reset()
+        try:
+            await self._pool.start()
+            return await main(self.url, self.max_products, self.progress, self.output_file, pool=self._pool)
+        finally:
+            await self._pool.close()
+            metrics.log_summary()
+
+    def _call(self, callback):
+        try:
+            self._loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            # Цикл событий уже закрыт: парсинг завершился
+            pass
+
+    def set_paused(self, paused):
+        """
+        Приостановка или продолжение загрузки страниц.
+
+        Аргументы:
+            paused (bool): True - приостановить, False - продолжить.
+        """
+        if self._loop:
+            self._call(self._pool.pause if paused else self._pool.resume)
+
+    def cancel(self):
+        """
+        Отмена парсинга. Записанные товары сохраняются в файл, журнал позволяет продолжить с --resume.
+        """
+        self._cancel_requested = True
+        if self._loop:
+            self._call(self._task.cancel)
+
+def format_duration(seconds):
+    """
+    Форматирование длительности в виде Ч:ММ:СС или ММ:СС.
+
+    Аргументы:
+        seconds (float): Длительность в секундах.
+
+    Возвращает:
+        str: Отформатированная длительность.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
 
 class ParserApp(QMainWindow):
     """
@@ -45,6 +170,10 @@ class ParserApp(QMainWindow):
     """
     def __init__(self):
         super().__init__()
+        self.worker = None
+        self.progress = None
+        self.log_buffer = None
+        self.paused = False
         self.initUI()
 
     def initUI(self):
@@ -52,7 +181,7 @@ class ParserApp(QMainWindow):
         Инициализация пользовательского интерфейса.
         """
         self.setWindowTitle("Парсер Vseinstrumenti.ru")
-        self.setGeometry(100, 100, 450, 520)
+        self.setGeometry(100, 100, 450, 550)
         self.setStyleSheet("background-color: #333333;")
 
         # Основной виджет и компоновка
@@ -142,6 +271,18 @@ class ParserApp(QMainWindow):
         progress_layout.addStretch()
         main_layout.addLayout(progress_layout)
 
+        # Скорость парсинга и оценка оставшегося времени
+        self.stats_label = QLabel("")
+        self.stats_label.setStyleSheet("font-size: 12px; color: #BBBBBB;")
+        self.stats_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(self.stats_label)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.update_stats)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh_progress)
+
         # Кнопка запуска парсинга
         self.parse_button = QPushButton("Начать парсинг")
         self.parse_button.setStyleSheet("""
@@ -163,6 +304,34 @@ class ParserApp(QMainWindow):
         self.parse_button.clicked.connect(self.start_parsing)
         main_layout.addLayout(parse_button_layout)
 
+        # Кнопки паузы и отмены парсинга
+        control_style = """
+            QPushButton {
+                font-size: 14px; padding: 6px; background-color: #555555;
+                color: white; border: none; border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #666666;
+            }
+            QPushButton:disabled {
+                background-color: #3C3C3C; color: #777777;
+            }
+        """
+        self.pause_button = QPushButton("Пауза")
+        self.pause_button.setStyleSheet(control_style)
+        self.pause_button.setEnabled(False)
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.cancel_button = QPushButton("Отмена")
+        self.cancel_button.setStyleSheet(control_style)
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_parsing)
+        control_layout = QHBoxLayout()
+        control_layout.addStretch()
+        control_layout.addWidget(self.pause_button, 1)
+        control_layout.addWidget(self.cancel_button, 1)
+        control_layout.addStretch()
+        main_layout.addLayout(control_layout)
+
         # Поле вывода статуса
         self.status_output = QTextEdit()
         self.status_output.setReadOnly(True)
@@ -177,29 +346,39 @@ class ParserApp(QMainWindow):
         status_layout.addStretch()
         main_layout.addLayout(status_layout)
 
-    async def run_parsing(self, url, max_products, output_file, progress_handler):
+    def update_stats(self):
         """
-        Запуск процесса парсинга.
+        Обновление скорости парсинга и оценки оставшегося времени по метрикам запуска.
+        """
+        elapsed = metrics.elapsed()
+        products_rate = metrics.rate("products")
+        pages = metrics.counters["pages_fetched"] + metrics.counters["pages_cached"]
+        text = (
+            f"Скорость: {products_rate:.1f} тов/с, {pages / elapsed if elapsed > 0 else 0.0:.2f} стр/с, "
+            f"прошло {format_duration(elapsed)}"
+        )
+        remaining = self.progress_bar.maximum() - self.progress_bar.value()
+        if self.progress_bar.maximum() > 0 and products_rate > 0:
+            text += f", осталось ~{format_duration(remaining / products_rate)}"
+        self.stats_label.setText(text)
 
-        Аргументы:
-            url (str): URL для парсинга.
-            max_products (int): Максимальное количество товаров.
-            output_file (str): Имя выходного Excel-файла.
-            progress_handler: Объект для обновления прогресс-бара.
+    def refresh_progress(self):
         """
-        try:
-            await main(url, max_products, progress_handler, output_file)
-            self.status_output.append(f"Парсинг завершен. Файл сохранен: {output_file}")
-        except Exception as e:
-            self.status_output.append(f"Ошибка парсинга: {str(e)}")
-        finally:
-            self.parse_button.setEnabled(True)
-            self.progress_bar.setValue(0)
+        Перенос прогресса и накопленных сообщений лога из потока парсинга в окно.
+        """
+        if self.progress:
+            done, total = self.progress.snapshot()
+            if total:
+                self.progress_bar.setMaximum(total)
+            self.progress_bar.setValue(min(done, self.progress_bar.maximum()))
+        if self.log_buffer:
+            lines = self.log_buffer.drain()
+            if lines:
+                self.status_output.append("\n".join(lines))
 
-    @qasync.asyncSlot()
-    async def start_parsing(self):
+    def start_parsing(self):
         """
-        Запуск парсинга при нажатии кнопки.
+        Запуск парсинга в отдельном потоке при нажатии кнопки.
         """
         url = self.url_input.text().strip()
         if not url:
@@ -215,15 +394,87 @@ class ParserApp(QMainWindow):
             self.status_output.append("Ошибка: Введите имя выходного файла")
             return
         self.parse_button.setEnabled(False)
+        self.pause_button.setEnabled(True)
+        self.cancel_button.setEnabled(True)
         self.status_output.append("Парсинг начат...")
-        progress_handler = TqdmToProgressBar(self.progress_bar)
-        await self.run_parsing(url, max_products, output_file, progress_handler)
+        self.progress = ProgressCounter()
+        self.log_buffer = LogBuffer()
+        logger.addHandler(self.log_buffer)
+        self.worker = ParseWorker(url, max_products, output_file, self.progress)
+        self.worker.succeeded.connect(self.on_succeeded)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.cancelled.connect(self.on_cancelled)
+        self.worker.finished.connect(self.finish_parsing)
+        self.worker.start()
+        self.refresh_timer.start()
+        self.stats_timer.start()
+
+    def toggle_pause(self):
+        """
+        Приостановка или продолжение парсинга при нажатии кнопки паузы.
+        """
+        self.paused = not self.paused
+        self.worker.set_paused(self.paused)
+        self.pause_button.setText("Продолжить" if self.paused else "Пауза")
+        self.status_output.append("Парсинг приостановлен" if self.paused else "Парсинг продолжен")
+
+    def cancel_parsing(self):
+        """
+        Отмена парсинга при нажатии кнопки отмены.
+        """
+        self.cancel_button.setEnabled(False)
+        self.pause_button.setEnabled(False)
+        self.status_output.append("Отмена парсинга...")
+        self.worker.cancel()
+
+    def on_succeeded(self, count):
+        self.refresh_progress()
+        self.status_output.append(f"Парсинг завершен. Файл сохранен: {self.worker.output_file}")
+        summary = metrics.summary()
+        self.status_output.append(
+            f"Товаров: {count} за {format_duration(summary['elapsed'])}, "
+            f"{summary['products_per_second']:.1f} тов/с"
+        )
+
+    def on_failed(self, error):
+        self.refresh_progress()
+        self.status_output.append(f"Ошибка парсинга: {error}")
+
+    def on_cancelled(self):
+        self.refresh_progress()
+        self.status_output.append(
+            f"Парсинг отменен. Собранные товары сохранены: {self.worker.output_file}; "
+            f"продолжить можно из командной строки с --resume"
+        )
+
+    def finish_parsing(self):
+        """
+        Возврат окна в исходное состояние после завершения потока парсинга.
+        """
+        self.refresh_timer.stop()
+        self.stats_timer.stop()
+        logger.removeHandler(self.log_buffer)
+        self.progress = None
+        self.log_buffer = None
+        self.worker = None
+        self.paused = False
+        self.pause_button.setText("Пауза")
+        self.pause_button.setEnabled(False)
+        self.cancel_button.setEnabled(False)
+        self.parse_button.setEnabled(True)
+        self.progress_bar.setValue(0)
+
+    def closeEvent(self, event):
+        """
+        Отмена незавершенного парсинга при закрытии окна.
+        """
+        if self.worker:
+            self.worker.cancel()
+            self.worker.wait(CANCEL_TIMEOUT)
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    loop = qasync.QEventLoop(app)
-    asyncio.set_event_loop(loop)
     window = ParserApp()
     window.show()
-    with loop:
-        loop.run_forever()
\ No newline at end of file
+    sys.exit(app.exec_())
\ No newline at end of file
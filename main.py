@@ -1,23 +1,54 @@
 """
 Основной скрипт для парсинга данных о товарах с сайта vseinstrumenti.ru.
 Этот скрипт:
-- Настраивает браузер Selenium для веб-скрейпинга.
-- Рассчитывает количество страниц на основе 40 товаров на странице и запроса пользователя.
-- Переходит по страницам с товарами, добавляя /pageX/ к URL.
-- Извлекает данные о товарах с помощью BeautifulSoup.
-- Сохраняет результаты в Excel-файл.
+- Настраивает пул загрузчиков страниц (HTTP-клиент с резервным браузером Selenium).
+- Определяет количество страниц и размер страницы по разметке первой страницы категории
+  и рассчитывает по ним точный набор страниц для запроса пользователя.
+- Параллельно загружает страницы с товарами, добавляя /pageX/ к URL, с адаптивным ограничением
+  частоты запросов и повторными попытками; не загруженные страницы откладываются, а не прерывают парсинг.
+- Извлекает данные о товарах быстрым движком (selectolax/lxml) или BeautifulSoup в пуле процессов,
+  не останавливая загрузку следующих страниц.
+- Потоково записывает результаты в Excel, CSV, JSONL или Parquet по мере парсинга страниц.
+- Опционально дополняет товары брендом, наличием и характеристиками с детальных страниц (--details),
+  загружая их в фоне параллельно с обходом категории.
+- Использует дисковый кеш страниц и режим офлайн (--cache, --offline).
+- Сохраняет HTML загруженных страниц в сжатый архив для повторного парсинга без сети (--archive, reparse.py).
+- Отбрасывает товары, повторно встретившиеся на других страницах при смещении выдачи;
+  индекс повторов можно сохранять между запусками (--dedup-index).
+- В дельта-режиме (--delta) записывает только новые, изменившиеся и пропавшие товары.
+- Ведет журнал контрольных точек и умеет продолжать прерванный парсинг (--resume).
+- Собирает метрики этапов и сохраняет сводку в JSON и формате Prometheus (--metrics-json, --metrics-prom,
+  --metrics-port).
 - Поддерживает отслеживание прогресса для интеграции с GUI.
 Скрипт обрабатывает ошибки и логирует ключевые события.
 """
 
+import argparse
 import asyncio
-from urllib.parse import urlparse, parse_qs, urlencode
-from utils.selenium_driver import setup_browser
-from utils.excel_creator import save_to_excel
-from utils.parse import get_page_content, parse_products
+import sys
+import time
+from contextlib import aclosing
+from utils.crawler import FetcherPool, build_page_url, crawl_pages, discover_pages, DEFAULT_WORKERS
+from utils.checkpoint import CheckpointJournal, journal_path
+from utils.dedup import DedupIndex
+from utils.details import DetailEnricher, OrderedEnrichment, DETAIL_FIELDS, DEFAULT_DETAIL_WORKERS
+from utils.product_index import ProductIndex, STATUS_FIELD
+from utils.page_cache import PageCache, DEFAULT_CACHE_DIR, DEFAULT_TTL, DEFAULT_MAX_BYTES
+from utils.html_archive import HtmlArchive, DEFAULT_ARCHIVE_DIR
+from utils.pipeline import create_parse_executor, parse_pages, DEFAULT_PARSE_WORKERS
+from utils.extractors import DEFAULT_PAGE_SIZE
+from utils.writers import create_writer, resolve_format, WRITERS
+from utils.parse import collect_products
+from utils.metrics import metrics, start_metrics_server
 from utils.logger import logger
 
-async def main(url, max_products=0, progress_handler=None, output_file="products.xlsx"):
+async def main(url, max_products=0, progress_handler=None, output_file="products.xlsx", workers=DEFAULT_WORKERS,
+               fetcher="auto", engine="auto", parse_workers=DEFAULT_PARSE_WORKERS, output_format=None,
+               resume=False, journal_file=None, cache_dir=None, cache_ttl=DEFAULT_TTL,
+               cache_max_bytes=DEFAULT_MAX_BYTES, cache_compress=False, offline=False, delta_index=None,
+               details=False, detail_workers=DEFAULT_DETAIL_WORKERS, metrics_json=None, metrics_prom=None,
+               dedup_index=None, archive_dir=None, pool=None, parse_executor=None, writer=None, row_extra=None, enricher=None,
+               dedup=None, failed_pages=None):
     """
     Основная функция парсинга.
 
@@ -25,70 +56,346 @@ async def main(url, max_products=0, progress_handler=None, output_file="products
         url (str): URL страницы категории товаров для парсинга.
         max_products (int): Максимальное количество товаров для парсинга (0 для всех).
         progress_handler: Объект для обновления прогресс-бара в GUI.
-        output_file (str): Имя выходного Excel-файла.
+        output_file (str): Имя выходного файла.
+        workers (int): Количество загрузчиков для параллельной загрузки страниц.
+        fetcher (str): Бэкенд загрузки: "auto" (HTTP с переключением на Selenium), "http" или "selenium".
+        engine (str): Движок извлечения товаров: "auto", "selectolax", "lxml" или "bs4".
+        parse_workers (int): Количество процессов парсинга (0 - парсинг в потоке).
+        output_format (str): Формат файла: "xlsx", "csv", "jsonl" или "parquet" (None - по расширению).
+        resume (bool): Продолжить прерванный парсинг по журналу, не загружая обработанные страницы повторно.
+        journal_file (str): Путь к журналу контрольных точек (по умолчанию рядом с выходным файлом).
+        cache_dir (str): Каталог кеша страниц (None - без кеша).
+        cache_ttl (float): Время жизни записи кеша в секундах.
+        cache_max_bytes (int): Максимальный размер кеша в байтах.
+        cache_compress (bool): Сжимать страницы в кеше.
+        offline (bool): Читать страницы только из кеша, без сети и браузера.
+        delta_index (str): Путь к индексу товаров SQLite. Если задан, в файл записываются
+            только новые, изменившиеся и пропавшие товары с полем "Статус".
+        details (bool): Дополнять товары данными детальных страниц (бренд, наличие, остаток, характеристики).
+        detail_workers (int): Количество одновременных загрузок детальных страниц.
+        metrics_json (str): Путь к файлу сводки метрик в JSON (None - не сохранять).
+        metrics_prom (str): Путь к файлу метрик в формате Prometheus (None - не сохранять).
+        dedup_index (str): Файл индекса повторов. Если задан, товары, выгруженные успешными
+            предыдущими запусками, не записываются повторно (None - повторы отбрасываются в пределах запуска).
+        archive_dir (str): Каталог архива HTML-кода загруженных страниц для повторного парсинга
+            (reparse.py; None - без архива).
+        pool (FetcherPool): Общий запущенный пул загрузки (для пакетного режима). Параметры
+            workers, fetcher и кеша при этом не используются, пул не закрывается.
+        parse_executor: Общий пул процессов парсинга (для пакетного режима).
+        writer: Общий объект записи (для пакетного режима); не закрывается.
+        row_extra (dict): Дополнительные поля, добавляемые к каждой записанной строке.
+        enricher (DetailEnricher): Общий загрузчик детальных страниц (для пакетного режима); не закрывается.
+        dedup (DedupIndex): Общий индекс повторов (для пакетного режима); не сохраняется.
+        failed_pages (list): Список, в который добавляются не загруженные страницы (словари page, url, error):
+            по нему вызывающий код отличает неполный результат от полного.
 
     Возвращает:
-        None
+        int: Количество спарсенных товаров.
+
+    Исключения:
+        Exception: Если парсинг прерван ошибкой; записанные товары сохраняются, журнал позволяет продолжить с --resume.
     """
-    driver = setup_browser()
-    products_data = []
+    shared_writer = writer is not None
     current_product_count = 0
     base_url = url.split("#")[0]
-    current_page = 1
+    output_format = resolve_format(output_file, output_format)
 
-    # Рассчитываем количество страниц (40 товаров на странице)
-    total_pages = (max_products + 39) // 40 if max_products > 0 else float('inf')
-    logger.info(f"Запрошено {max_products} товаров, требуется {total_pages} страниц")
+    # Предварительная оценка количества страниц для размера пула, уточняется по первой странице
+    total_pages = -(-max_products // DEFAULT_PAGE_SIZE) if max_products > 0 else float('inf')
 
     if progress_handler and max_products > 0:
         progress_handler.set_total(max_products)
 
+    journal = CheckpointJournal(journal_file or journal_path(output_file), base_url, resume)
+    cached_pages = dict(journal.pages)
+    dead_letters = []
+    own_pool = pool is None
+    cache = None
+    archive = None
+    if own_pool:
+        # В пакетном режиме метрики общие для всех категорий и сбрасываются пакетом
+        metrics.reset()
+        if offline and not cache_dir:
+            cache_dir = DEFAULT_CACHE_DIR
+        cache = PageCache(cache_dir, cache_ttl, cache_max_bytes, cache_compress) if cache_dir else None
+        archive = HtmlArchive(archive_dir) if archive_dir else None
+        pool = FetcherPool(min(workers, total_pages), fetcher, cache=cache, offline=offline, archive=archive)
+    executor = parse_executor if parse_executor is not None else create_parse_executor(parse_workers)
+    index = ProductIndex(delta_index, base_url) if delta_index else None
+    own_dedup = dedup is None
+    if own_dedup:
+        dedup = DedupIndex(dedup_index)
+    own_enricher = enricher is None and details
+    if own_enricher:
+        enricher = DetailEnricher(pool, detail_workers, base_url=base_url)
+    extra_fields = (DETAIL_FIELDS if enricher else ()) + ((STATUS_FIELD,) if index else ())
+    completed = False
+    pages_done = 0
+    started = time.perf_counter()
+
+    def write_rows(rows):
+        nonlocal writer
+        # Файл создается при первой странице с товарами, строки пишутся сразу
+        if writer is None:
+            writer = create_writer(output_file, output_format, extra_fields)
+        if row_extra:
+            rows = [row.with_extra(row_extra) for row in rows]
+        with metrics.timer("write"):
+            writer.write_rows(rows)
+        metrics.inc("rows_written", len(rows))
+
+    if index and not shared_writer:
+        # В дельта-режиме файл создается и без изменений, иначе остался бы файл с изменениями прошлого запуска
+        writer = create_writer(output_file, output_format, extra_fields)
+
+    # Детальные страницы загружаются в фоне, а страницы записываются в исходном порядке по готовности
+    stage = OrderedEnrichment(enricher, write_rows) if enricher else None
+
     try:
-        current_url = base_url
-        while current_url and (max_products == 0 or current_product_count < max_products):
-            if current_page > total_pages:
-                logger.info(f"Достигнуто максимальное количество страниц: {total_pages}")
-                break
+        if own_pool:
+            await pool.start()
+        pagination = journal.pagination
+        if pagination is None:
+            first_page, pagination = await discover_pages(pool, base_url)
+            if pagination:
+                journal.record_pagination(pagination)
+                cached_pages.setdefault(1, first_page)
+        total_pages = plan_pages(max_products, pagination)
+        if progress_handler and max_products == 0 and pagination and pagination["products"]:
+            progress_handler.set_total(pagination["products"])
 
-            soup = await get_page_content(driver, current_url)
-            if not soup:
-                logger.warning(f"Не удалось загрузить страницу: {current_url}")
-                break
+        start_page = 1
+        while True:
+            last_page = 0
+            pages = crawl_pages(pool, base_url, total_pages, cached_pages, dead_letters, start_page)
+            async with aclosing(parse_pages(pages, executor, engine)) as parsed_pages:
+                async for page_num, products in parsed_pages:
+                    pages_done += 1
+                    last_page = page_num
+                    journal.record_page(
+                        page_num, build_page_url(base_url, page_num), [product.record() for product in products],
+                    )
+                    skipped = [] if index else None
+                    page_products, current_product_count = collect_products(
+                        products, max_products, current_product_count, progress_handler, dedup, skipped
+                    )
+                    metrics.inc("products", len(page_products))
+                    if index:
+                        # Отброшенные повторы остаются в категории: индекс не должен счесть их пропавшими
+                        index.mark_seen(skipped)
+                        page_products = index.diff(page_products)
+                    if page_products and stage:
+                        await stage.submit(page_products)
+                    elif page_products:
+                        write_rows(page_products)
 
-            page_products, current_product_count = await parse_products(
-                soup, max_products, current_product_count, progress_handler
-            )
-            products_data.extend(page_products)
+                    if max_products > 0 and current_product_count >= max_products:
+                        logger.info(f"Достигнуто запрошенное количество товаров: {max_products}")
+                        break
 
-            if max_products > 0 and current_product_count >= max_products:
-                logger.info(f"Достигнуто запрошенное количество товаров: {max_products}")
+            # Повторы уменьшили количество товаров на запланированных страницах: догружаются следующие
+            shortfall = max_products - current_product_count
+            if max_products <= 0 or shortfall <= 0 or last_page < total_pages:
                 break
+            start_page = total_pages + 1
+            total_pages = extend_pages(total_pages, shortfall, pagination)
+            if start_page > total_pages:
+                break
+            logger.info(f"Не хватает {shortfall} товаров, загрузка страниц {start_page}-{total_pages}")
 
-            # Формируем URL следующей страницы
-            parsed_url = urlparse(base_url)
-            query = parse_qs(parsed_url.query)
-            next_page_num = current_page + 1
-            next_path = parsed_url.path.rstrip('/') + f'/page{next_page_num}/'
-            next_url = parsed_url._replace(path=next_path).geturl()
-            if query:
-                next_url += '?' + urlencode(query, doseq=True)
-
-            current_url = next_url if next_page_num <= total_pages else None
-            current_page += 1
-            await asyncio.sleep(0.5)  # Задержка для избежания блокировки
+        tile_elapsed = time.perf_counter() - started
+        logger.info(
+            f"Страницы категории: обработано {pages_done} за {tile_elapsed:.1f} с "
+            f"({pages_done / tile_elapsed if tile_elapsed > 0 else 0.0:.1f} стр/с)"
+        )
+        if stage:
+            await stage.finish()
+        if index and dead_letters:
+            # Журнальные страницы при --resume сравниваются с индексом повторно и не должны стать "без изменений"
+            logger.warning("Индекс товаров не обновлен: есть не загруженные страницы, запустите парсинг с --resume")
+        elif index:
+            # Пропавшие товары можно определить только после обхода всей категории
+            if max_products == 0:
+                removed = index.removed()
+                if removed:
+                    write_rows(removed)
+            index.commit()
+        # Как и журнал, индекс повторов не сохраняется с отложенными страницами: иначе при --resume
+        # товары из журнала были бы отброшены как уже выгруженные
+        if own_dedup and not dead_letters:
+            dedup.commit()
+        completed = True
 
     except Exception as e:
         logger.error(f"Ошибка парсинга: {str(e)}")
+        logger.info("Для продолжения с места остановки запустите парсинг повторно с --resume")
+        raise
     finally:
-        driver.quit()
+        if failed_pages is not None:
+            failed_pages.extend(dead_letters)
+        if stage:
+            stage.cancel()
+        if own_dedup:
+            dedup.log_stats()
+        if own_enricher:
+            enricher.log_stats()
+            enricher.close()
+        # Журнал с отложенными страницами остается незавершенным, чтобы --resume догрузил их
+        if completed and not dead_letters:
+            journal.mark_done()
+        journal.close()
+        if index:
+            index.close()
+        if own_pool:
+            await pool.close()
+        if executor and parse_executor is None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if writer and not shared_writer:
+            with metrics.timer("write_close"):
+                writer.close()
+        if cache:
+            cache.log_stats()
+        if archive:
+            archive.close()
+            archive.log_stats()
+        if own_pool:
+            export_metrics(metrics_json, metrics_prom)
 
-    if products_data:
-        save_to_excel(products_data, output_file)
-        logger.info(f"Парсинг завершен, Excel сохранен: {output_file}")
+    if dead_letters:
+        logger.warning(f"Не загружено страниц: {len(dead_letters)}. Для повторной загрузки запустите парсинг с --resume")
+        for entry in dead_letters:
+            logger.warning(f"Не загружена страница {entry['page']}: {entry['url']} ({entry['error']})")
+    if shared_writer:
+        logger.info(f"Парсинг категории завершен: {base_url}, товаров: {current_product_count}")
+    elif writer:
+        logger.info(f"Парсинг завершен, файл сохранен: {output_file}")
     else:
         logger.warning("Нет данных для сохранения")
+    return current_product_count
+
+def export_metrics(metrics_json=None, metrics_prom=None):
+    """
+    Вывод сводки метрик в лог и сохранение в файлы.
+
+    Аргументы:
+        metrics_json (str): Путь к файлу сводки в JSON (None - не сохранять).
+        metrics_prom (str): Путь к файлу в формате Prometheus (None - не сохранять).
+    """
+    metrics.log_summary()
+    try:
+        if metrics_json:
+            metrics.write_json(metrics_json)
+        if metrics_prom:
+            metrics.write_prometheus(metrics_prom)
+    except OSError as e:
+        logger.error(f"Ошибка сохранения метрик: {str(e)}")
+
+def plan_pages(max_products, pagination=None):
+    """
+    Расчет количества страниц для загрузки.
+
+    Аргументы:
+        max_products (int): Максимальное количество товаров (0 для всех).
+        pagination (dict): Пагинация категории (None, если не определена).
+
+    Возвращает:
+        int: Количество страниц (float('inf'), если оно неизвестно и загружаются все страницы).
+    """
+    page_size = pagination and pagination["page_size"] or DEFAULT_PAGE_SIZE
+    category_pages = pagination and pagination["pages"] or float('inf')
+    requested_pages = -(-max_products // page_size) if max_products > 0 else float('inf')
+    total_pages = min(requested_pages, category_pages)
+    logger.info(f"Запрошено {max_products} товаров, требуется {total_pages} страниц")
+    return total_pages
+
+def extend_pages(total_pages, shortfall, pagination=None):
+    """
+    Расчет количества страниц, когда на запланированных страницах не хватило товаров.
+
+    Аргументы:
+        total_pages (int): Количество уже загруженных страниц.
+        shortfall (int): Сколько товаров не хватает.
+        pagination (dict): Пагинация категории (None, если не определена).
+
+    Возвращает:
+        int: Новое количество страниц, не больше количества страниц категории.
+    """
+    page_size = pagination and pagination["page_size"] or DEFAULT_PAGE_SIZE
+    category_pages = pagination and pagination["pages"] or float('inf')
+    return min(total_pages + -(-shortfall // page_size), category_pages)
+
+def add_run_arguments(parser):
+    """
+    Добавление общих параметров запуска (используются также пакетным режимом batch.py).
+
+    Аргументы:
+        parser (argparse.ArgumentParser): Парсер аргументов.
+    """
+    parser.add_argument("-n", "--max-products", type=int, default=0, help="Максимальное количество товаров (0 для всех)")
+    parser.add_argument("-o", "--output", default="products.xlsx", help="Имя выходного файла")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS), help="Формат выходного файла (по умолчанию по расширению)")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS, help="Количество параллельных загрузчиков")
+    parser.add_argument("--fetcher", choices=["auto", "http", "selenium"], default="auto", help="Бэкенд загрузки страниц")
+    parser.add_argument("--engine", choices=["auto", "selectolax", "lxml", "bs4"], default="auto", help="Движок извлечения товаров")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS, help="Количество процессов парсинга")
+    parser.add_argument("--resume", action="store_true", help="Продолжить прерванный парсинг по журналу контрольных точек")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE_DIR, metavar="DIR", help="Включить дисковый кеш страниц")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL / 3600, help="Время жизни кеша в часах")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // 1024 // 1024, help="Максимальный размер кеша в МБ")
+    parser.add_argument("--cache-compress", action="store_true", help="Сжимать страницы в кеше")
+    parser.add_argument("--offline", action="store_true", help="Читать страницы только из кеша, без сети и браузера")
+    parser.add_argument("--archive", nargs="?", const=DEFAULT_ARCHIVE_DIR, metavar="DIR", help="Сохранять HTML загруженных страниц в архив для reparse.py")
+    parser.add_argument("--delta", metavar="INDEX", help="Записывать только новые, изменившиеся и пропавшие товары (индекс SQLite)")
+    parser.add_argument("--dedup-index", metavar="FILE", help="Не выгружать повторно товары из предыдущих запусков (файл индекса повторов)")
+    parser.add_argument("--details", action="store_true", help="Дополнить товары данными детальных страниц")
+    parser.add_argument("--detail-workers", type=int, default=DEFAULT_DETAIL_WORKERS, help="Количество одновременных загрузок детальных страниц")
+    parser.add_argument("--metrics-json", metavar="FILE", help="Сохранить сводку метрик запуска в JSON")
+    parser.add_argument("--metrics-prom", metavar="FILE", help="Сохранить метрики в формате Prometheus")
+    parser.add_argument("--metrics-port", type=int, help="Отдавать метрики Prometheus по HTTP на порту (/metrics)")
+
+def run_options(args):
+    """
+    Преобразование общих параметров запуска в аргументы функции main.
+
+    Аргументы:
+        args (argparse.Namespace): Аргументы, добавленные add_run_arguments.
+
+    Возвращает:
+        dict: Именованные аргументы.
+    """
+    return dict(
+        output_file=args.output, workers=args.workers, fetcher=args.fetcher, engine=args.engine,
+        parse_workers=args.parse_workers, output_format=args.format, resume=args.resume,
+        cache_dir=args.cache, cache_ttl=args.cache_ttl * 3600, cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+        cache_compress=args.cache_compress, offline=args.offline, delta_index=args.delta,
+        dedup_index=args.dedup_index, archive_dir=args.archive, details=args.details, detail_workers=args.detail_workers,
+        metrics_json=args.metrics_json, metrics_prom=args.metrics_prom,
+    )
+
+def parse_args():
+    """
+    Разбор аргументов командной строки.
+
+    Возвращает:
+        argparse.Namespace: Аргументы запуска.
+    """
+    parser = argparse.ArgumentParser(description="Парсер товаров vseinstrumenti.ru")
+    parser.add_argument("url", nargs="?", help="URL страницы категории (без него параметры запрашиваются интерактивно)")
+    parser.add_argument("--journal", help="Путь к журналу контрольных точек (по умолчанию <output>.journal.jsonl)")
+    add_run_arguments(parser)
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    url = input("Введите URL для парсинга (например, https://www.vseinstrumenti.ru/category/perforatory-32/): ")
-    max_products = int(input("Введите максимальное количество товаров (0 для всех): "))
-    asyncio.run(main(url, max_products))
\ No newline at end of file
+    args = parse_args()
+    if args.url:
+        url, max_products = args.url, args.max_products
+    else:
+        url = input("Введите URL для парсинга (например, https://www.vseinstrumenti.ru/category/perforatory-32/): ")
+        max_products = int(input("Введите максимальное количество товаров (0 для всех): "))
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    try:
+        asyncio.run(main(url, max_products, journal_file=args.journal, **run_options(args)))
+    except Exception:
+        # Ошибка уже записана в лог
+        sys.exit(1)
\ No newline at end of file
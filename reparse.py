@@ -0,0 +1,164 @@
+"""
+Скрипт повторного парсинга архива страниц без обращения к сети.
+Этот скрипт:
+- Читает индекс архива HTML-кода страниц (utils.html_archive), сохраненного запусками с --archive.
+- Парсит страницы архива параллельно в пуле процессов: каждый процесс сам читает свою часть сегмента
+  через mmap, поэтому HTML не передается между процессами, а в работе одновременно находится
+  не больше двух частей на процесс.
+- Записывает товары в выходной файл в порядке категорий и номеров страниц, отбрасывая повторы.
+- Позволяет выбрать страницы одной категории (--category), например после изменения правил извлечения.
+"""
+
+import argparse
+import time
+from collections import deque
+from pathlib import Path
+from utils.crawler import split_page_url
+from utils.html_archive import read_index, DEFAULT_ARCHIVE_DIR
+from utils.page_cache import normalize_url
+from utils.pipeline import parse_archived, create_parse_executor, DEFAULT_PARSE_WORKERS
+from utils.product import Product
+from utils.dedup import DedupIndex
+from utils.parse import collect_products
+from utils.writers import create_writer, resolve_format, WRITERS
+from utils.logger import logger
+
+CHUNK_PAGES = 32
+
+def order_pages(entries, category=None):
+    """
+    Упорядочивание страниц архива: категории - в порядке первого сохранения, страницы категории - по номерам
+    (страницы загружаются параллельно и сохраняются в архив в порядке завершения загрузки).
+
+    Аргументы:
+        entries (list): Записи индекса архива.
+        category (str): URL категории, страницы которой оставляются (None - все страницы).
+
+    Возвращает:
+        list: Записи индекса в порядке парсинга.
+    """
+    category = normalize_url(category) if category else None
+    categories = {}
+    pages = []
+    for entry in entries:
+        base_url, page_num = split_page_url(entry["url"])
+        base_url = normalize_url(base_url)
+        if category and base_url != category:
+            continue
+        pages.append((categories.setdefault(base_url, len(categories)), page_num, entry))
+    pages.sort(key=lambda page: page[:2])
+    return [entry for _, _, entry in pages]
+
+def plan_chunks(entries, chunk_pages=CHUNK_PAGES):
+    """
+    Разбиение страниц архива на части для процессов парсинга: не больше chunk_pages
+    подряд идущих страниц одного сегмента.
+
+    Аргументы:
+        entries (list): Записи индекса архива в порядке парсинга.
+        chunk_pages (int): Максимальное количество страниц в части.
+
+    Возвращает:
+        list: Пары (имя сегмента, список пар (смещение, длина)).
+    """
+    chunks = []
+    for entry in entries:
+        span = (entry["offset"], entry["length"])
+        if chunks and chunks[-1][0] == entry["segment"] and len(chunks[-1][1]) < chunk_pages:
+            chunks[-1][1].append(span)
+        else:
+            chunks.append((entry["segment"], [span]))
+    return chunks
+
+def reparse(archive_dir=DEFAULT_ARCHIVE_DIR, output_file="products.xlsx", output_format=None, engine="auto",
+            parse_workers=DEFAULT_PARSE_WORKERS, category=None):
+    """
+    Повторный парсинг всех страниц архива.
+
+    Аргументы:
+        archive_dir (str): Каталог архива.
+        output_file (str): Имя выходного файла.
+        output_format (str): Формат файла: "xlsx", "csv", "jsonl" или "parquet" (None - по расширению).
+        engine (str): Движок извлечения товаров.
+        parse_workers (int): Количество процессов парсинга (0 - парсинг в текущем процессе).
+        category (str): URL категории, страницы которой парсятся (None - все страницы архива).
+
+    Возвращает:
+        int: Количество записанных товаров.
+    """
+    output_format = resolve_format(output_file, output_format)
+    try:
+        entries = read_index(archive_dir)
+    except FileNotFoundError:
+        logger.error(f"Архив страниц не найден: {archive_dir}")
+        return 0
+    entries = order_pages(entries, category)
+    if not entries:
+        logger.warning("В архиве нет страниц для парсинга")
+        return 0
+
+    chunks = plan_chunks(entries)
+    executor = create_parse_executor(parse_workers)
+    dedup = DedupIndex()
+    writer = None
+    product_count = 0
+    started = time.perf_counter()
+    logger.info(f"Повторный парсинг архива {archive_dir}: страниц {len(entries)}, частей {len(chunks)}")
+
+    def parsed_chunks():
+        if executor is None:
+            for segment, spans in chunks:
+                yield parse_archived(str(Path(archive_dir) / segment), spans, engine)
+            return
+        # Ограниченное окно частей: результаты выдаются по порядку, не накапливаясь в памяти
+        window = deque()
+        for segment, spans in chunks:
+            window.append(executor.submit(parse_archived, str(Path(archive_dir) / segment), spans, engine))
+            if len(window) >= parse_workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+    try:
+        for pages in parsed_chunks():
+            for records in pages:
+                products, product_count = collect_products(
+                    [Product.from_record(record) for record in records], 0, product_count, dedup=dedup,
+                )
+                if products:
+                    if writer is None:
+                        writer = create_writer(output_file, output_format)
+                    writer.write_rows(products)
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if writer:
+            writer.close()
+        dedup.log_stats()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Повторный парсинг завершен: страниц {len(entries)}, товаров {product_count} за {elapsed:.1f} с "
+        f"({len(entries) / elapsed if elapsed > 0 else 0.0:.1f} стр/с)"
+    )
+    return product_count
+
+def parse_args():
+    """
+    Разбор аргументов командной строки.
+
+    Возвращает:
+        argparse.Namespace: Аргументы запуска.
+    """
+    parser = argparse.ArgumentParser(description="Повторный парсинг архива страниц vseinstrumenti.ru без сети")
+    parser.add_argument("archive", nargs="?", default=DEFAULT_ARCHIVE_DIR, help="Каталог архива страниц")
+    parser.add_argument("-o", "--output", default="products.xlsx", help="Имя выходного файла")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS), help="Формат выходного файла (по умолчанию по расширению)")
+    parser.add_argument("--engine", choices=["auto", "selectolax", "lxml", "bs4"], default="auto", help="Движок извлечения товаров")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS, help="Количество процессов парсинга")
+    parser.add_argument("--category", metavar="URL", help="Парсить только страницы категории")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    reparse(args.archive, args.output, args.format, args.engine, args.parse_workers, args.category)
\ No newline at end of file
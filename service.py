@@ -0,0 +1,335 @@
+"""
+Скрипт сервиса парсинга с HTTP/JSON API.
+Этот скрипт:
+- Принимает задания парсинга (URL категории, количество товаров, формат файла) по HTTP.
+- Выполняет несколько заданий одновременно на общем пуле загрузчиков и пуле процессов парсинга.
+- Передает прогресс заданий потоком Server-Sent Events; источником прогресса служит тот же
+  протокол progress_handler (set_total/update), что и у прогресс-бара GUI.
+- Отдает файлы результатов завершенных заданий и позволяет отменить задание.
+- Отличает полный результат (done) от неполного (partial: часть страниц не загружена после всех попыток)
+  и от ошибки (failed); неполный результат тоже можно скачать.
+- Отдает метрики парсинга в формате Prometheus (GET /metrics).
+
+API:
+    POST   /jobs               {"url": ..., "max_products": 0, "format": "xlsx", "details": false}
+    GET    /jobs               список заданий
+    GET    /jobs/{id}          состояние задания
+    GET    /jobs/{id}/events   прогресс задания (text/event-stream)
+    GET    /jobs/{id}/result   файл результата
+    DELETE /jobs/{id}          отмена задания
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from pathlib import Path
+from aiohttp import web
+from batch import category_slug
+from main import main
+from utils.crawler import FetcherPool, DEFAULT_WORKERS
+from utils.page_cache import PageCache, DEFAULT_CACHE_DIR
+from utils.pipeline import create_parse_executor, DEFAULT_PARSE_WORKERS
+from utils.rate_limit import AdaptiveRateLimiter
+from utils.writers import resolve_format
+from utils.metrics import metrics
+from utils.logger import logger
+
+DEFAULT_PORT = 8080
+DEFAULT_JOBS = 2
+DEFAULT_OUTPUT_DIR = "jobs"
+# Минимальный интервал между событиями прогресса одного потока SSE, в секундах
+PROGRESS_INTERVAL = 0.5
+KEEPALIVE_INTERVAL = 15
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_PARTIAL = "partial"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINAL_STATUSES = (STATUS_DONE, STATUS_PARTIAL, STATUS_FAILED, STATUS_CANCELLED)
+RESULT_STATUSES = (STATUS_DONE, STATUS_PARTIAL)
+
+class Job:
+    """
+    Задание парсинга. Реализует протокол progress_handler (set_total/update)
+    и оповещает подписчиков потока событий об изменениях.
+    """
+    def __init__(self, url, max_products, output_format, output_file, details=False):
+        self.id = uuid.uuid4().hex[:12]
+        self.url = url
+        self.max_products = max_products
+        self.output_format = output_format
+        self.output_file = output_file
+        self.details = details
+        self.status = STATUS_QUEUED
+        self.total = max_products
+        self.done = 0
+        self.error = None
+        self.failed_pages = []
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.task = None
+        self._changed = asyncio.Event()
+
+    def set_total(self, total):
+        self.total = total
+        self.notify()
+
+    def update(self, n=1):
+        self.done += n
+        self.notify()
+
+    def notify(self):
+        # Каждое изменение будит ожидающих подписчиков; новое событие ждет следующего изменения
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_changed(self, timeout):
+        """
+        Ожидание изменения состояния задания.
+
+        Аргументы:
+            timeout (float): Максимальное время ожидания в секундах.
+
+        Возвращает:
+            bool: True, если состояние изменилось.
+        """
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "url": self.url,
+            "max_products": self.max_products,
+            "format": self.output_format,
+            "details": self.details,
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "error": self.error,
+            "failed_pages": [entry["page"] for entry in self.failed_pages],
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "elapsed": round((self.finished or time.time()) - self.started, 3) if self.started else 0.0,
+            "result": f"/jobs/{self.id}/result" if self.status in RESULT_STATUSES else None,
+        }
+
+class JobManager:
+    """
+    Очередь заданий парсинга на общем пуле загрузки. Одновременно выполняется не больше jobs заданий.
+    """
+    def __init__(self, output_dir=DEFAULT_OUTPUT_DIR, jobs=DEFAULT_JOBS, workers=DEFAULT_WORKERS, fetcher="auto",
+                 engine="auto", parse_workers=DEFAULT_PARSE_WORKERS, cache_dir=None, rate=None):
+        self.output_dir = Path(output_dir)
+        self.engine = engine
+        self.jobs = {}
+        self.pool = FetcherPool(
+            workers, fetcher, cache=PageCache(cache_dir) if cache_dir else None,
+            rate_limiter=AdaptiveRateLimiter(rate, max_rate=rate) if rate else None,
+        )
+        self.executor = create_parse_executor(parse_workers)
+        self._semaphore = asyncio.Semaphore(max(1, jobs))
+
+    async def start(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        await self.pool.start()
+
+    def submit(self, url, max_products=0, output_format="xlsx", details=False):
+        """
+        Постановка задания в очередь.
+
+        Аргументы:
+            url (str): URL категории.
+            max_products (int): Максимальное количество товаров (0 для всех).
+            output_format (str): Формат файла результата.
+            details (bool): Дополнять товары данными детальных страниц.
+
+        Возвращает:
+            Job: Задание.
+
+        Исключения:
+            ValueError: Если параметры задания некорректны.
+        """
+        if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+            raise ValueError("Не указан URL категории (http:// или https://)")
+        if not isinstance(max_products, int) or max_products < 0:
+            raise ValueError("max_products должно быть неотрицательным целым числом")
+        output_format = resolve_format("", output_format)
+        job = Job(url, max_products, output_format, None, bool(details))
+        job.output_file = str(self.output_dir / f"{job.id}.{output_format}")
+        job.task = asyncio.create_task(self._run(job))
+        self.jobs[job.id] = job
+        logger.info(f"Задание {job.id} поставлено в очередь: {url}")
+        return job
+
+    async def _run(self, job):
+        try:
+            async with self._semaphore:
+                job.status = STATUS_RUNNING
+                job.started = time.time()
+                job.notify()
+                count = await main(
+                    job.url, job.max_products, job, job.output_file, engine=self.engine,
+                    output_format=job.output_format, details=job.details,
+                    pool=self.pool, parse_executor=self.executor, failed_pages=job.failed_pages,
+                )
+            job.done = count
+            if not Path(job.output_file).exists():
+                job.status = STATUS_FAILED
+                job.error = "Нет данных для сохранения"
+            elif job.failed_pages:
+                job.status = STATUS_PARTIAL
+                job.error = f"Не загружено страниц: {len(job.failed_pages)}"
+            else:
+                job.status = STATUS_DONE
+        except asyncio.CancelledError:
+            job.status = STATUS_CANCELLED
+        except Exception as e:
+            logger.error(f"Ошибка задания {job.id}: {str(e)}")
+            job.status = STATUS_FAILED
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+            job.notify()
+            logger.info(f"Задание {job.id} завершено: {job.status}, товаров {job.done}")
+
+    def cancel(self, job):
+        if job.status not in FINAL_STATUSES:
+            job.task.cancel()
+
+    async def close(self):
+        """
+        Отмена незавершенных заданий и закрытие общих пулов.
+        """
+        for job in self.jobs.values():
+            self.cancel(job)
+        await asyncio.gather(*(job.task for job in self.jobs.values()), return_exceptions=True)
+        await self.pool.close()
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+def get_job(request):
+    job = request.app["manager"].jobs.get(request.match_info["job_id"])
+    if job is None:
+        raise web.HTTPNotFound(text=json.dumps({"error": "Задание не найдено"}), content_type="application/json")
+    return job
+
+async def create_job(request):
+    try:
+        payload = await request.json()
+        job = request.app["manager"].submit(
+            payload.get("url"), payload.get("max_products", 0), payload.get("format", "xlsx"), payload.get("details", False),
+        )
+    except (ValueError, AttributeError) as e:
+        return web.json_response({"error": str(e)}, status=400)
+    return web.json_response(job.to_dict(), status=201, headers={"Location": f"/jobs/{job.id}"})
+
+async def list_jobs(request):
+    return web.json_response([job.to_dict() for job in request.app["manager"].jobs.values()])
+
+async def job_status(request):
+    return web.json_response(get_job(request).to_dict())
+
+async def job_events(request):
+    """
+    Поток событий прогресса задания (Server-Sent Events). События отправляются не чаще
+    PROGRESS_INTERVAL; поток закрывается после завершения задания.
+    """
+    job = get_job(request)
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+    while True:
+        finished = job.status in FINAL_STATUSES
+        event = "done" if finished else "progress"
+        await response.write(f"event: {event}\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n".encode("utf-8"))
+        if finished:
+            break
+        await asyncio.sleep(PROGRESS_INTERVAL)
+        if job.status not in FINAL_STATUSES and not await job.wait_changed(KEEPALIVE_INTERVAL):
+            await response.write(b": keepalive\n\n")
+    return response
+
+async def job_result(request):
+    job = get_job(request)
+    if job.status not in RESULT_STATUSES:
+        return web.json_response({"error": f"Результат не готов: {job.status}"}, status=409)
+    filename = f"products_{category_slug(job.url)}.{job.output_format}"
+    return web.FileResponse(job.output_file, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+async def cancel_job(request):
+    job = get_job(request)
+    request.app["manager"].cancel(job)
+    return web.json_response(job.to_dict(), status=202)
+
+async def metrics_text(request):
+    return web.Response(text=metrics.prometheus_text(), content_type="text/plain", charset="utf-8")
+
+def create_app(manager):
+    """
+    Создание приложения aiohttp.
+
+    Аргументы:
+        manager (JobManager): Очередь заданий.
+
+    Возвращает:
+        web.Application: Приложение.
+    """
+    app = web.Application()
+    app["manager"] = manager
+
+    async def on_startup(app):
+        await manager.start()
+
+    async def on_cleanup(app):
+        await manager.close()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_post("/jobs", create_job)
+    app.router.add_get("/jobs", list_jobs)
+    app.router.add_get("/jobs/{job_id}", job_status)
+    app.router.add_get("/jobs/{job_id}/events", job_events)
+    app.router.add_get("/jobs/{job_id}/result", job_result)
+    app.router.add_delete("/jobs/{job_id}", cancel_job)
+    app.router.add_get("/metrics", metrics_text)
+    return app
+
+def parse_args():
+    """
+    Разбор аргументов командной строки.
+
+    Возвращает:
+        argparse.Namespace: Аргументы запуска.
+    """
+    parser = argparse.ArgumentParser(description="Сервис парсинга товаров vseinstrumenti.ru с HTTP API")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес сервиса")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Порт сервиса")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Каталог файлов результатов")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Количество одновременно выполняемых заданий")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS, help="Количество параллельных загрузчиков")
+    parser.add_argument("--fetcher", choices=["auto", "http", "selenium"], default="auto", help="Бэкенд загрузки страниц")
+    parser.add_argument("--engine", choices=["auto", "selectolax", "lxml", "bs4"], default="auto", help="Движок извлечения товаров")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS, help="Количество процессов парсинга")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE_DIR, metavar="DIR", help="Включить дисковый кеш страниц")
+    parser.add_argument("--rate", type=float, help="Общий лимит запросов в секунду")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    manager = JobManager(
+        args.output_dir, args.jobs, args.workers, args.fetcher, args.engine, args.parse_workers, args.cache, args.rate,
+    )
+    web.run_app(create_app(manager), host=args.host, port=args.port)
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+Модуль пула браузеров Selenium.
+Этот модуль:
+- Хранит запущенные браузеры между заданиями парсинга, чтобы не запускать Chrome заново для каждого задания.
+- Проверяет работоспособность браузера перед выдачей и заменяет зависшие или закрытые браузеры.
+- Перезапускает браузер после заданного количества страниц или при превышении порога памяти
+  (память процессов браузера определяется через psutil, если он установлен).
+- Предоставляет общий пул процесса, который закрывается при завершении программы.
+"""
+
+import atexit
+import threading
+from utils.selenium_driver import setup_browser
+from utils.metrics import metrics
+from utils.logger import logger
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DEFAULT_MAX_PAGES = 200
+DEFAULT_MAX_MEMORY_MB = 1024
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def browser_memory_mb(driver):
+    """
+    Память, занятая ChromeDriver и процессами браузера.
+
+    Аргументы:
+        driver (WebDriver): Объект браузера Selenium.
+
+    Возвращает:
+        float: Память в МБ или None, если ее нельзя определить.
+    """
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / 1024 / 1024
+    except Exception:
+        return None
+
+
+def is_alive(driver):
+    """
+    Проверка, что браузер отвечает на команды.
+
+    Аргументы:
+        driver (WebDriver): Объект браузера Selenium.
+
+    Возвращает:
+        bool: True, если браузер работоспособен.
+    """
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+class BrowserPool:
+    """
+    Потокобезопасный пул браузеров, переиспользуемых между загрузчиками и заданиями.
+    """
+    def __init__(self, browser_factory=setup_browser, max_pages=DEFAULT_MAX_PAGES,
+                 max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.started = 0
+        self.recycled = 0
+        self._browser_factory = browser_factory
+        self._idle = []
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Получение работоспособного браузера: свободного из пула или нового.
+
+        Возвращает:
+            WebDriver: Объект браузера Selenium.
+        """
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                break
+            if is_alive(driver):
+                return driver
+            logger.warning("Браузер не отвечает, запуск нового")
+            self._quit(driver)
+
+        with metrics.timer("browser_start"):
+            driver = self._browser_factory()
+        with self._lock:
+            self._pages[driver] = 0
+            self.started += 1
+        return driver
+
+    def page_done(self, driver):
+        """
+        Учет загруженной страницы.
+
+        Аргументы:
+            driver (WebDriver): Объект браузера Selenium.
+
+        Возвращает:
+            bool: True, если браузер нужно перезапустить.
+        """
+        with self._lock:
+            self._pages[driver] = self._pages.get(driver, 0) + 1
+            pages = self._pages[driver]
+        if self.max_pages and pages >= self.max_pages:
+            logger.info(f"Перезапуск браузера после {pages} страниц")
+            return True
+        # Память проверяется не на каждой странице: обход дерева процессов не бесплатен
+        if self.max_memory_mb and pages % 10 == 0:
+            memory = browser_memory_mb(driver)
+            if memory is not None and memory > self.max_memory_mb:
+                logger.info(f"Перезапуск браузера: занято {memory:.0f} МБ памяти")
+                return True
+        return False
+
+    def release(self, driver, recycle=False):
+        """
+        Возврат браузера в пул. Неработоспособный или отслуживший браузер закрывается.
+
+        Аргументы:
+            driver (WebDriver): Объект браузера Selenium.
+            recycle (bool): Закрыть браузер вместо возврата в пул.
+        """
+        if recycle or not is_alive(driver):
+            with self._lock:
+                self.recycled += 1
+            self._quit(driver)
+            return
+        with self._lock:
+            self._idle.append(driver)
+
+    def _quit(self, driver):
+        with self._lock:
+            self._pages.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f"Ошибка закрытия браузера: {str(e)}")
+
+    def close(self):
+        """
+        Закрытие всех свободных браузеров.
+        """
+        with self._lock:
+            drivers, self._idle = self._idle, []
+        for driver in drivers:
+            self._quit(driver)
+        if self.started:
+            logger.info(f"Пул браузеров закрыт: запущено {self.started}, перезапущено {self.recycled}")
+
+
+def shared_browser_pool():
+    """
+    Общий пул браузеров процесса. Браузеры сохраняются между заданиями парсинга
+    и закрываются при завершении программы.
+
+    Возвращает:
+        BrowserPool: Пул браузеров.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
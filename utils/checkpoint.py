@@ -0,0 +1,121 @@
+"""
+Модуль журнала контрольных точек для возобновления прерванного парсинга.
+Этот модуль:
+- Ведет append-only журнал в формате JSON Lines рядом с выходным файлом.
+- Записывает каждую успешно обработанную страницу: номер, URL и извлеченные товары
+  (кортежи типизированных полей, см. utils.product.Product.record).
+- Сохраняет пагинацию категории, определенную по первой странице, чтобы при возобновлении
+  не загружать первую страницу повторно.
+- Загружает журнал при возобновлении, пропуская оборванную последнюю строку.
+- Отмечает завершение прохода, чтобы отличать завершенный запуск от прерванного.
+"""
+
+import json
+import time
+from pathlib import Path
+from utils.logger import logger
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+# Версия формата записей товаров; журналы другой версии не используются для возобновления
+JOURNAL_VERSION = 2
+
+
+def journal_path(output_file):
+    """
+    Путь к журналу по умолчанию для выходного файла.
+
+    Аргументы:
+        output_file (str): Имя выходного файла.
+
+    Возвращает:
+        str: Путь к журналу.
+    """
+    return f"{output_file}{JOURNAL_SUFFIX}"
+
+
+def load_journal(path, base_url):
+    """
+    Загрузка обработанных страниц из журнала.
+
+    Аргументы:
+        path (str): Путь к журналу.
+        base_url (str): URL категории, для которой запускается парсинг.
+
+    Возвращает:
+        tuple: Словарь номер страницы -> список записей товаров и пагинация (dict или None).
+        Пустые, если журнал отсутствует, относится к другой категории или записан в другом формате.
+    """
+    pages = {}
+    pagination = None
+    if not Path(path).exists():
+        return pages, pagination
+    with open(path, encoding="utf-8") as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Последняя строка могла оборваться при аварийном завершении
+                logger.warning(f"Пропущена поврежденная строка журнала: {path}")
+                continue
+            if entry.get("type") == "run" and entry.get("url") != base_url:
+                logger.warning(f"Журнал {path} относится к другой категории: {entry.get('url')}")
+                return {}, None
+            if entry.get("type") == "run" and entry.get("version") != JOURNAL_VERSION:
+                logger.warning(f"Журнал {path} записан в другом формате, парсинг начнется заново")
+                return {}, None
+            if entry.get("type") == "page":
+                pages[entry["page"]] = [tuple(record) for record in entry["products"]]
+            elif entry.get("type") == "pagination":
+                pagination = entry["pagination"]
+    return pages, pagination
+
+
+class CheckpointJournal:
+    """
+    Журнал обработанных страниц. Каждая запись сразу сбрасывается на диск.
+    """
+    def __init__(self, path, base_url, resume=False):
+        self.path = path
+        self.base_url = base_url
+        self.pages, self.pagination = load_journal(path, base_url) if resume else ({}, None)
+        if self.pages or self.pagination:
+            logger.info(f"Возобновление по журналу {path}: обработано страниц: {len(self.pages)}")
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+        self._append({"type": "run", "url": base_url, "version": JOURNAL_VERSION, "started": time.time()})
+
+    def _append(self, entry):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def record_page(self, page_num, url, records):
+        """
+        Запись обработанной страницы.
+
+        Аргументы:
+            page_num (int): Номер страницы.
+            url (str): URL страницы.
+            records (list): Записи товаров страницы.
+        """
+        if page_num in self.pages:
+            return
+        self.pages[page_num] = records
+        self._append({"type": "page", "page": page_num, "url": url, "products": records})
+
+    def record_pagination(self, pagination):
+        """
+        Запись пагинации категории.
+
+        Аргументы:
+            pagination (dict): Пагинация (см. utils.extractors.parse_pagination).
+        """
+        self.pagination = pagination
+        self._append({"type": "pagination", "pagination": pagination})
+
+    def mark_done(self):
+        self._append({"type": "done", "finished": time.time()})
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
@@ -0,0 +1,401 @@
+"""
+Модуль для параллельного обхода страниц категории.
+Этот модуль:
+- Формирует URL страниц пагинации, добавляя /pageN/ к URL категории.
+- Управляет пулом загрузчиков (HTTP или Selenium), каждый из которых работает в отдельном потоке.
+- Ограничивает частоту запросов адаптивным token bucket (utils.rate_limit), который подстраивается
+  под задержку ответов и ответы 429/5xx/защиты от ботов, и лимитом одновременных запросов к хосту.
+- Повторяет неудачные загрузки с экспоненциальной задержкой и случайным разбросом, не занимая загрузчик
+  на время ожидания, а не загруженные страницы откладывает в список неудачных, не останавливая обход.
+- Берет страницы из дискового кеша, если он включен, и сохраняет в него загруженные.
+- Сохраняет HTML загруженных из сети страниц в архив (utils.html_archive), если он включен,
+  для повторного парсинга без сети.
+- Позволяет приостановить и продолжить сетевые запросы пула (например, по кнопке в GUI).
+- Определяет количество страниц по разметке первой страницы, чтобы загружать точный набор страниц
+  без запросов за пределами последней.
+- Возвращает страницы строго в порядке их номеров, независимо от порядка завершения загрузки.
+"""
+
+import asyncio
+import random
+import re
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse, parse_qs, urlencode
+from utils.extractors import parse_pagination
+from utils.fetchers import fetcher_factory, FetchError, TILE_MARKER
+from utils.parse import get_page_html
+from utils.metrics import metrics
+from utils.rate_limit import AdaptiveRateLimiter
+from utils.logger import logger
+
+DEFAULT_WORKERS = 4
+PAGE_DELAY = 0.5  # Начальная задержка между страницами для одного загрузчика
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 30.0
+PAGE_RETRIES = 3
+MAX_FAILED_IN_ROW = 3  # Неудачных страниц подряд, после которых обход останавливается
+
+_PAGE_PATH_RE = re.compile(r'/page(\d+)/?$')
+
+
+def build_page_url(base_url, page_num):
+    """
+    Формирование URL страницы пагинации.
+
+    Аргументы:
+        base_url (str): URL первой страницы категории.
+        page_num (int): Номер страницы (начиная с 1).
+
+    Возвращает:
+        str: URL страницы.
+    """
+    if page_num <= 1:
+        return base_url
+    parsed_url = urlparse(base_url)
+    query = parse_qs(parsed_url.query)
+    next_path = parsed_url.path.rstrip('/') + f'/page{page_num}/'
+    page_url = parsed_url._replace(path=next_path, query="").geturl()
+    if query:
+        page_url += '?' + urlencode(query, doseq=True)
+    return page_url
+
+
+def split_page_url(page_url):
+    """
+    Разбор URL страницы пагинации (обратное преобразование build_page_url).
+
+    Аргументы:
+        page_url (str): URL страницы.
+
+    Возвращает:
+        tuple: URL первой страницы категории и номер страницы.
+    """
+    parsed_url = urlparse(page_url)
+    match = _PAGE_PATH_RE.search(parsed_url.path)
+    if not match:
+        return page_url, 1
+    return parsed_url._replace(path=parsed_url.path[:match.start()] + "/").geturl(), int(match.group(1))
+
+
+def backoff_delay(attempt):
+    """
+    Задержка перед повторной загрузкой: экспоненциальная, со случайным разбросом,
+    чтобы повторы разных страниц не приходили на сайт одновременно.
+
+    Аргументы:
+        attempt (int): Номер неудачной попытки (начиная с 1).
+
+    Возвращает:
+        float: Задержка в секундах.
+    """
+    delay = min(BASE_BACKOFF * 2 ** (attempt - 1), MAX_BACKOFF)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class FetchWorker:
+    """
+    Загрузчик пула. Выполняет одну попытку загрузки с учетом ограничений частоты
+    и сообщает ограничителю задержку ответа или блокировку со стороны сайта.
+    """
+    def __init__(self, fetcher, throttle=None, rate_limiter=None):
+        self.fetcher = fetcher
+        self.throttle = throttle or _no_throttle
+        self.rate_limiter = rate_limiter
+
+    async def fetch(self, url):
+        """
+        Загрузка страницы.
+
+        Аргументы:
+            url (str): URL для загрузки.
+
+        Возвращает:
+            str: HTML-код страницы или None, если страница не существует.
+
+        Исключения:
+            FetchError и другие ошибки загрузчика, если загрузка не удалась.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.throttle(url):
+            started = loop.time()
+            try:
+                html = await get_page_html(self.fetcher, url)
+            except FetchError as e:
+                if e.blocked:
+                    metrics.inc("blocked")
+                    if self.rate_limiter:
+                        self.rate_limiter.record_blocked()
+                raise
+        if self.rate_limiter:
+            self.rate_limiter.record_success(loop.time() - started)
+        return html
+
+
+class FetcherPool:
+    """
+    Пул загрузчиков для параллельной загрузки страниц.
+    Если ограничитель частоты не задан, создается адаптивный с начальной частотой
+    size / delay запросов в секунду (delay=0 - без ограничения).
+    """
+    def __init__(self, size=DEFAULT_WORKERS, backend="auto", make_fetcher=None, delay=PAGE_DELAY,
+                 cache=None, offline=False, rate_limiter=None, host_limiter=None, retries=PAGE_RETRIES, archive=None):
+        self.size = max(1, size)
+        self.cache = cache
+        self.archive = archive
+        self.offline = offline
+        self.retries = retries
+        if rate_limiter is None and delay > 0:
+            rate_limiter = AdaptiveRateLimiter(self.size / delay)
+        self.rate_limiter = rate_limiter
+        self.host_limiter = host_limiter
+        self._backend = backend
+        self._make_fetcher = make_fetcher
+        self._workers = []
+        self._idle = asyncio.Queue()
+        self._running = set()
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+
+    async def start(self):
+        """
+        Запуск загрузчиков пула. Первый загрузчик запускается отдельно,
+        остальные - параллельно, после того как путь к ChromeDriver уже определен.
+        В режиме офлайн загрузчики не создаются: страницы читаются только из кеша.
+        """
+        if self.offline:
+            logger.info("Режим офлайн: страницы читаются из кеша")
+            return
+        if self._make_fetcher is None:
+            self._make_fetcher = fetcher_factory(self._backend, pool_size=self.size)
+        fetchers = [self._make_fetcher() for _ in range(self.size)]
+        await asyncio.to_thread(fetchers[0].start)
+        await asyncio.gather(*(asyncio.to_thread(fetcher.start) for fetcher in fetchers[1:]))
+        for fetcher in fetchers:
+            worker = FetchWorker(fetcher, throttle=self.throttle, rate_limiter=self.rate_limiter)
+            self._workers.append(worker)
+            self._idle.put_nowait(worker)
+        logger.info(f"Запущено загрузчиков: {len(self._workers)}")
+
+    @property
+    def paused(self):
+        return not self._resumed.is_set()
+
+    def pause(self):
+        """
+        Приостановка новых сетевых запросов. Начатые загрузки завершаются.
+        """
+        if not self.paused:
+            self._resumed.clear()
+            logger.info("Загрузка приостановлена")
+
+    def resume(self):
+        if self.paused:
+            self._resumed.set()
+            logger.info("Загрузка продолжена")
+
+    @asynccontextmanager
+    async def throttle(self, url):
+        """
+        Ожидание разрешения на сетевой запрос: снятие паузы, общий лимит частоты
+        и лимит одновременных запросов к хосту.
+
+        Аргументы:
+            url (str): URL запроса.
+        """
+        await self._resumed.wait()
+        if self.rate_limiter:
+            await self.rate_limiter.acquire()
+        if self.host_limiter:
+            async with self.host_limiter.slot(url):
+                yield
+        else:
+            yield
+
+    async def fetch(self, url):
+        """
+        Загрузка страницы из кеша или первым свободным загрузчиком с повторными попытками.
+        Загрузчик возвращается в пул только после завершения попытки,
+        даже если ожидающая задача была отменена.
+
+        Аргументы:
+            url (str): URL для загрузки.
+
+        Возвращает:
+            str: HTML-код страницы или None, если страница не существует или отсутствует в кеше в режиме офлайн.
+
+        Исключения:
+            FetchError: Если все попытки загрузки не удались.
+        """
+        if self.cache:
+            with metrics.timer("cache_read"):
+                html = await asyncio.to_thread(self.cache.get, url, self.offline)
+            if html is not None:
+                metrics.inc("pages_cached")
+                return html
+        if self.offline:
+            logger.warning(f"Страница отсутствует в кеше: {url}")
+            return None
+
+        html = await self._fetch_network(url)
+        if html is not None:
+            metrics.inc("pages_fetched")
+        # Кешируются и архивируются только страницы с карточками товаров, а не страницы ошибок и защиты от ботов
+        if html and TILE_MARKER in html:
+            if self.cache:
+                await asyncio.to_thread(self.cache.put, url, html)
+            if self.archive:
+                await asyncio.to_thread(self.archive.put, url, html)
+        return html
+
+    async def _fetch_network(self, url):
+        for attempt in range(1, self.retries + 2):
+            try:
+                return await self._attempt(url)
+            except Exception as e:
+                if attempt > self.retries:
+                    raise FetchError(f"{str(e)} (попыток: {attempt})") from e
+                # Загрузчик на время ожидания возвращается в пул и загружает другие страницы
+                delay = backoff_delay(attempt)
+                metrics.inc("retries")
+                logger.warning(f"Ошибка загрузки {url}: {str(e)}, повтор через {delay:.1f} с")
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, url):
+        worker = await self._idle.get()
+        task = asyncio.ensure_future(worker.fetch(url))
+        self._running.add(task)
+
+        def release(done_task):
+            self._running.discard(done_task)
+            self._idle.put_nowait(worker)
+            # Ошибка попытки, которую уже никто не ждет, не должна попадать в лог как необработанная
+            if not done_task.cancelled():
+                done_task.exception()
+
+        task.add_done_callback(release)
+        return await asyncio.shield(task)
+
+    async def close(self):
+        """
+        Остановка незавершенных загрузок и закрытие всех загрузчиков.
+        """
+        for task in list(self._running):
+            task.cancel()
+        for worker in self._workers:
+            try:
+                await asyncio.to_thread(worker.fetcher.close)
+            except Exception as e:
+                logger.error(f"Ошибка закрытия загрузчика: {str(e)}")
+        if self._workers and self.rate_limiter:
+            logger.info(f"Частота запросов в конце обхода: {self.rate_limiter.rate:.2f} запр/с")
+        self._workers.clear()
+
+
+@asynccontextmanager
+async def _no_throttle(url):
+    yield
+
+
+async def discover_pages(pool, base_url):
+    """
+    Загрузка первой страницы категории и определение пагинации по ее разметке.
+
+    Аргументы:
+        pool (FetcherPool): Пул загрузчиков.
+        base_url (str): URL первой страницы категории.
+
+    Возвращает:
+        tuple: HTML-код первой страницы и пагинация (см. utils.extractors.parse_pagination);
+        None вместо них, если страницу не удалось загрузить.
+    """
+    try:
+        html = await pool.fetch(base_url)
+    except FetchError as e:
+        logger.warning(f"Не удалось определить пагинацию, первая страница не загружена: {str(e)}")
+        return None, None
+    if html is None:
+        return None, None
+    pagination = parse_pagination(html)
+    logger.info(
+        f"Пагинация категории: товаров {pagination['products'] or 'неизвестно'}, "
+        f"страниц {pagination['pages'] or 'неизвестно'}, товаров на странице {pagination['page_size']}"
+    )
+    return html, pagination
+
+
+async def crawl_pages(pool, base_url, total_pages=float('inf'), cached_pages=None, dead_letters=None, first_page=1):
+    """
+    Параллельная загрузка страниц категории.
+    Если количество страниц известно заранее, загружается до двух страниц на загрузчик,
+    иначе - не больше страниц, чем загрузчиков, чтобы не запрашивать лишние страницы за концом категории.
+    Результаты выдаются в порядке номеров страниц. Не загруженная страница пропускается
+    и добавляется в список неудачных; обход останавливается на несуществующей странице
+    или после MAX_FAILED_IN_ROW неудачных страниц подряд. При остановке после неудачных страниц
+    оставшиеся до total_pages страницы тоже добавляются в список неудачных.
+
+    Аргументы:
+        pool (FetcherPool): Пул загрузчиков.
+        base_url (str): URL первой страницы категории.
+        total_pages (int): Максимальное количество страниц.
+        cached_pages (dict): Уже загруженные или обработанные страницы (номер -> HTML-код или записи товаров),
+            которые не загружаются повторно.
+        dead_letters (list): Список, в который добавляются неудачные страницы (словари page, url, error).
+        first_page (int): Номер первой загружаемой страницы.
+
+    Возвращает:
+        AsyncIterator[tuple]: Номер страницы и ее HTML-код (или список записей для обработанной страницы).
+    """
+    cached_pages = cached_pages or {}
+    loop = asyncio.get_running_loop()
+    tasks = {}
+    next_page = first_page
+    expected_page = first_page
+    failed_in_row = 0
+    stopped = False
+    window = pool.size * 2 if total_pages != float('inf') else pool.size
+    try:
+        while expected_page <= total_pages:
+            while next_page <= total_pages and len(tasks) < window:
+                if next_page in cached_pages:
+                    tasks[next_page] = loop.create_future()
+                    tasks[next_page].set_result(cached_pages[next_page])
+                else:
+                    tasks[next_page] = asyncio.create_task(pool.fetch(build_page_url(base_url, next_page)))
+                next_page += 1
+
+            try:
+                html = await tasks.pop(expected_page)
+            except FetchError as e:
+                page_url = build_page_url(base_url, expected_page)
+                logger.error(f"Страница не загружена и отложена: {page_url}: {str(e)}")
+                metrics.inc("pages_failed")
+                if dead_letters is not None:
+                    dead_letters.append({"page": expected_page, "url": page_url, "error": str(e)})
+                expected_page += 1
+                failed_in_row += 1
+                if failed_in_row >= MAX_FAILED_IN_ROW:
+                    logger.error(f"Не загружено {failed_in_row} страниц подряд, обход остановлен")
+                    stopped = True
+                    break
+                continue
+            if html is None:
+                logger.info(f"Страница не существует, обход завершен: {build_page_url(base_url, expected_page)}")
+                break
+            failed_in_row = 0
+            yield expected_page, html
+            expected_page += 1
+        else:
+            logger.info(f"Достигнуто максимальное количество страниц: {total_pages}")
+        if stopped and total_pages != float('inf'):
+            # Оставшиеся страницы не пропускаются молча: обработанные ранее выдаются,
+            # остальные откладываются вместе с неудачными для повторной загрузки с --resume
+            error = f"обход остановлен после {MAX_FAILED_IN_ROW} неудачных страниц подряд"
+            for page_num in range(expected_page, total_pages + 1):
+                if page_num in cached_pages:
+                    yield page_num, cached_pages[page_num]
+                elif dead_letters is not None:
+                    dead_letters.append({"page": page_num, "url": build_page_url(base_url, page_num), "error": error})
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
@@ -0,0 +1,97 @@
+"""
+Модуль индекса повторяющихся товаров.
+Этот модуль:
+- Отбрасывает товары, уже встретившиеся в запуске: при смещении выдачи во время обхода
+  один артикул может попасть на две страницы.
+- Определяет товар по артикулу, а товар без артикула - по URL.
+- Может использоваться несколькими категориями пакета одновременно (общий индекс).
+- Может сохраняться в файл, чтобы следующие запуски не выгружали уже выгруженные товары.
+  Новые артикулы дописываются в файл только после успешного запуска.
+- Считает долю повторов.
+"""
+
+from pathlib import Path
+from utils.metrics import metrics
+from utils.logger import logger
+
+
+def product_key(product):
+    """
+    Ключ товара для поиска повторов.
+
+    Аргументы:
+        product (Product): Данные о товаре.
+
+    Возвращает:
+        Артикул (int), URL (str) или None, если товар нельзя определить.
+    """
+    return product.code if product.code is not None else product.url
+
+
+class DedupIndex:
+    """
+    Множество ключей встретившихся товаров. Точное: в отличие от фильтра Блума,
+    не отбрасывает уникальные товары, а артикулы-числа занимают немного памяти.
+    """
+    def __init__(self, path=None):
+        """
+        Аргументы:
+            path (str): Файл индекса (один ключ на строку); None - индекс только в памяти.
+        """
+        self.path = path
+        self.unique = 0
+        self.duplicates = 0
+        self._seen = set()
+        self._new = []
+        if path and Path(path).exists():
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    key = line.rstrip("\n")
+                    if key:
+                        self._seen.add(int(key) if key.isdigit() else key)
+            logger.info(f"Загружен индекс дубликатов {path}: товаров {len(self._seen)}")
+
+    def add(self, product):
+        """
+        Проверка и запоминание товара. Вызывается только для товаров, которые будут записаны,
+        чтобы сохраненный индекс не содержал невыгруженных товаров.
+
+        Аргументы:
+            product (Product): Данные о товаре.
+
+        Возвращает:
+            bool: True, если товар встретился впервые.
+        """
+        key = product_key(product)
+        if key is not None:
+            if key in self._seen:
+                self.duplicates += 1
+                metrics.inc("duplicates")
+                return False
+            self._seen.add(key)
+            self._new.append(key)
+        self.unique += 1
+        return True
+
+    def rate(self):
+        """
+        Возвращает:
+            float: Доля повторов среди всех проверенных товаров.
+        """
+        total = self.unique + self.duplicates
+        return self.duplicates / total if total else 0.0
+
+    def commit(self):
+        """
+        Сохранение новых ключей в файл индекса.
+        """
+        if self.path and self._new:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.writelines(f"{key}\n" for key in self._new)
+        self._new = []
+
+    def log_stats(self):
+        if self.unique or self.duplicates:
+            logger.info(
+                f"Дубликаты товаров: уникальных {self.unique}, дубликатов {self.duplicates} ({self.rate():.1%})"
+            )
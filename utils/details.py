@@ -0,0 +1,273 @@
+"""
+Модуль обогащения товаров данными детальных страниц.
+Этот модуль:
+- Извлекает с детальной страницы товара бренд, наличие, остаток и характеристики
+  из разметки JSON-LD (schema.org Product), а характеристики - также из блока характеристик.
+- Загружает детальные страницы параллельно с ограничением количества одновременных загрузок,
+  соблюдая общий лимит частоты запросов пула загрузки.
+- Загружает страницу каждого товара один раз: повторы по артикулу берутся из памяти,
+  а страницы - из дискового кеша, если он включен.
+- Обогащает страницы в фоне и передает их на запись в исходном порядке, не останавливая обход категории.
+- Считает скорость загрузки детальных страниц отдельно от страниц категории.
+"""
+
+import asyncio
+import json
+import re
+import time
+from collections import deque
+from urllib.parse import urlparse
+from utils.crawler import backoff_delay
+from utils.fetchers import HttpFetcher, FetchError, is_blocked_status
+from utils.metrics import metrics
+from utils.logger import logger
+
+DEFAULT_DETAIL_WORKERS = 8
+DETAIL_RETRIES = 2
+DEFAULT_MAX_PENDING_PAGES = 4
+DETAIL_FIELDS = ("Бренд", "Наличие", "Остаток", "Характеристики")
+
+JSON_LD_RE = re.compile(r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>', re.S)
+SPECS_BLOCK_RE = re.compile(r'data-qa="product-characteristics"(.*?)</dl>', re.S)
+SPEC_ITEM_RE = re.compile(r'<dt[^>]*>(.*?)</dt>\s*<dd[^>]*>(.*?)</dd>', re.S)
+TAG_RE = re.compile(r'<[^>]+>')
+
+AVAILABILITY = {
+    "InStock": "в наличии",
+    "LimitedAvailability": "в наличии",
+    "OnlineOnly": "в наличии",
+    "OutOfStock": "нет в наличии",
+    "SoldOut": "нет в наличии",
+    "Discontinued": "снят с продажи",
+    "PreOrder": "под заказ",
+    "BackOrder": "под заказ",
+}
+
+
+def _json_ld_product(html):
+    for match in JSON_LD_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        for item in data if isinstance(data, list) else data.get("@graph", [data]):
+            if isinstance(item, dict) and item.get("@type") == "Product":
+                return item
+    return {}
+
+
+def _text(fragment):
+    return " ".join(TAG_RE.sub(" ", fragment).split())
+
+
+def _stock(value):
+    if isinstance(value, dict):
+        value = value.get("value")
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_details(html):
+    """
+    Извлечение данных детальной страницы товара.
+
+    Аргументы:
+        html (str): HTML-код детальной страницы.
+
+    Возвращает:
+        dict: Значения полей DETAIL_FIELDS (остаток - целое число; None, если поле не найдено).
+    """
+    product = _json_ld_product(html)
+    brand = product.get("brand")
+    if isinstance(brand, dict):
+        brand = brand.get("name")
+    offers = product.get("offers") or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    availability = str(offers.get("availability") or "").rsplit("/", 1)[-1]
+
+    specs = [
+        (item.get("name"), item.get("value"))
+        for item in product.get("additionalProperty") or []
+        if isinstance(item, dict)
+    ]
+    block = SPECS_BLOCK_RE.search(html)
+    if block:
+        # Блок характеристик на странице обычно полнее, чем JSON-LD
+        page_specs = [(_text(name), _text(value)) for name, value in SPEC_ITEM_RE.findall(block.group(1))]
+        if len(page_specs) > len(specs):
+            specs = page_specs
+
+    return {
+        "Бренд": str(brand).strip() if brand else None,
+        "Наличие": AVAILABILITY.get(availability),
+        "Остаток": _stock(offers.get("inventoryLevel")),
+        "Характеристики": "; ".join(f"{name}: {value}" for name, value in specs if name) or None,
+    }
+
+
+class DetailEnricher:
+    """
+    Загрузка детальных страниц товаров с ограничением параллельности и дедупликацией по артикулу.
+    Использует ограничители частоты и кеш пула загрузки (FetcherPool), но не его загрузчики,
+    поэтому не замедляет загрузку страниц категории.
+    """
+    def __init__(self, pool, workers=DEFAULT_DETAIL_WORKERS, retries=DETAIL_RETRIES, base_url=None):
+        self.pool = pool
+        self.retries = retries
+        self.base_url = base_url
+        self.fetched = 0
+        self.cached = 0
+        self.duplicates = 0
+        self.failed = 0
+        self._started = None
+        self._finished = None
+        self._http = HttpFetcher(pool_size=workers, stage="detail_http")
+        self._semaphore = asyncio.Semaphore(max(1, workers))
+        self._details = {}
+
+    def detail_url(self, product_url):
+        """
+        URL детальной страницы. Если задан base_url, страница загружается с того же хоста,
+        что и категория (зеркало сайта или локальный сервер фикстур).
+
+        Аргументы:
+            product_url (str): URL товара со страницы категории.
+
+        Возвращает:
+            str: URL для загрузки.
+        """
+        if not self.base_url:
+            return product_url
+        base = urlparse(self.base_url)
+        return urlparse(product_url)._replace(scheme=base.scheme, netloc=base.netloc).geturl()
+
+    async def enrich(self, products):
+        """
+        Добавление полей детальных страниц к товарам.
+
+        Аргументы:
+            products (list): Список записей о товарах (Product).
+
+        Возвращает:
+            list: Товары с дополнительными полями DETAIL_FIELDS.
+        """
+        tasks = []
+        for product in products:
+            if product.url is None:
+                tasks.append(None)
+                continue
+            key = product.code if product.code is not None else product.url
+            task = self._details.get(key)
+            if task is not None and not task.cancelled():
+                self.duplicates += 1
+            else:
+                self._details[key] = asyncio.ensure_future(self._load(self.detail_url(product.url)))
+            tasks.append(self._details[key])
+        # Загрузки общие для категорий пакета: отмена обогащения одной категории не должна отменять их для других
+        details = iter(await asyncio.gather(*(asyncio.shield(task) for task in tasks if task is not None)))
+        empty = dict.fromkeys(DETAIL_FIELDS)
+        return [
+            product.with_extra(next(details) if task is not None else empty)
+            for product, task in zip(products, tasks)
+        ]
+
+    async def _load(self, url):
+        cache = self.pool.cache
+        if cache:
+            html = await asyncio.to_thread(cache.get, url, self.pool.offline)
+            if html is not None:
+                self.cached += 1
+                return await asyncio.to_thread(self._extract, html)
+        if self.pool.offline:
+            return dict.fromkeys(DETAIL_FIELDS)
+
+        if self._started is None:
+            self._started = time.perf_counter()
+        limiter = self.pool.rate_limiter
+        for attempt in range(1, self.retries + 2):
+            try:
+                async with self._semaphore, self.pool.throttle(url):
+                    fetch_started = time.perf_counter()
+                    html = await asyncio.to_thread(self._fetch, url)
+                if limiter:
+                    limiter.record_success(time.perf_counter() - fetch_started)
+                break
+            except Exception as e:
+                if isinstance(e, FetchError) and e.blocked:
+                    metrics.inc("blocked")
+                    if limiter:
+                        limiter.record_blocked()
+                if attempt > self.retries:
+                    logger.warning(f"Детальная страница не загружена: {url}: {str(e)}")
+                    self.failed += 1
+                    return dict.fromkeys(DETAIL_FIELDS)
+                # Ожидание повтора не занимает место среди одновременных загрузок
+                await asyncio.sleep(backoff_delay(attempt))
+        self._finished = time.perf_counter()
+        self.fetched += 1
+        metrics.inc("detail_pages")
+        if cache:
+            await asyncio.to_thread(cache.put, url, html)
+        return await asyncio.to_thread(self._extract, html)
+
+    def _extract(self, html):
+        with metrics.timer("detail_extract"):
+            return extract_details(html)
+
+    def _fetch(self, url):
+        status, html = self._http.request(url)
+        if status != 200 or html is None:
+            raise FetchError(f"HTTP {status}", status, blocked=is_blocked_status(status))
+        return html
+
+    def log_stats(self):
+        if not (self.fetched or self.cached or self.duplicates or self.failed):
+            return
+        elapsed = (self._finished or 0.0) - (self._started or 0.0)
+        rate = self.fetched / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"Детальные страницы: загружено {self.fetched} ({rate:.1f} стр/с), из кеша {self.cached}, "
+            f"повторов {self.duplicates}, ошибок {self.failed}"
+        )
+
+    def close(self):
+        self._http.close()
+
+
+class OrderedEnrichment:
+    """
+    Фоновое обогащение страниц товаров с передачей результатов на запись в исходном порядке.
+    Одновременно обогащается не больше max_pending страниц; при превышении submit() ждет
+    самую старую страницу, сдерживая обход категории, только если детальные страницы не успевают.
+    """
+    def __init__(self, enricher, write, max_pending=DEFAULT_MAX_PENDING_PAGES):
+        self.enricher = enricher
+        self.write = write
+        self.max_pending = max(1, max_pending)
+        self._pending = deque()
+
+    async def submit(self, products):
+        """
+        Добавление страницы товаров на обогащение и запись готовых страниц.
+
+        Аргументы:
+            products (list): Список записей о товарах (Product).
+        """
+        self._pending.append(asyncio.ensure_future(self.enricher.enrich(products)))
+        while self._pending and (self._pending[0].done() or len(self._pending) > self.max_pending):
+            self.write(await self._pending.popleft())
+
+    async def finish(self):
+        """
+        Ожидание и запись всех оставшихся страниц.
+        """
+        while self._pending:
+            self.write(await self._pending.popleft())
+
+    def cancel(self):
+        for task in self._pending:
+            task.cancel()
+        self._pending.clear()
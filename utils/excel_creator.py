@@ -1,46 +1,94 @@
 """
 Модуль для сохранения спарсенных данных о товарах в Excel-файл.
 Этот модуль:
-- Преобразует данные о товарах в pandas DataFrame.
-- Форматирует Excel-файл с настроенными ширинами столбцов и стилизованными заголовками.
+- Записывает товары потоково через книгу openpyxl в режиме write-only, не держа весь каталог в памяти.
+- Записывает числовые поля товара (артикул, цена в рублях, рейтинг, отзывы) числами, а не текстом.
+- Настраивает ширины столбцов и стилизованные заголовки до записи первой строки.
 - Обрабатывает ошибки при создании Excel и логирует результаты.
 """
 
-import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, Alignment
+from utils.product import PRODUCT_FIELDS
 from utils.logger import logger
 
+SHEET_NAME = "Товары"
+COLUMN_WIDTH = 20
+
+
+class ExcelStreamWriter:
+    """
+    Потоковая запись товаров в Excel-файл.
+    Строки добавляются по мере парсинга страниц, файл собирается при закрытии.
+    Используется как контекстный менеджер: файл сохраняется и при ошибке парсинга.
+    """
+    def __init__(self, filename="products.xlsx", extra_fields=()):
+        self.filename = filename
+        self.extra_fields = tuple(extra_fields)
+        self.columns = list(PRODUCT_FIELDS) + list(self.extra_fields)
+        self.rows_written = 0
+        self._workbook = Workbook(write_only=True)
+        self._worksheet = self._workbook.create_sheet(SHEET_NAME)
+
+        # Настройка ширины столбцов и стилизация заголовков
+        header = []
+        for col_idx, col_name in enumerate(self.columns, start=1):
+            self._worksheet.column_dimensions[get_column_letter(col_idx)].width = COLUMN_WIDTH
+            cell = WriteOnlyCell(self._worksheet, value=col_name)
+            cell.font = Font(bold=True)
+            cell.alignment = Alignment(horizontal="center")
+            header.append(cell)
+        self._worksheet.append(header)
+
+    def write_rows(self, products):
+        """
+        Добавление товаров в файл.
+
+        Аргументы:
+            products (list): Список записей о товарах (Product).
+        """
+        for product in products:
+            self._worksheet.append(product.row(self.extra_fields))
+        self.rows_written += len(products)
+
+    def close(self):
+        """
+        Сохранение Excel-файла.
+
+        Исключения:
+            Exception: Если сохранение Excel-файла не удалось.
+        """
+        if self._workbook is None:
+            return
+        try:
+            self._workbook.save(self.filename)
+            logger.info(f"Excel-файл сохранен: {self.filename}, строк: {self.rows_written}")
+        except Exception as e:
+            logger.error(f"Ошибка сохранения Excel: {str(e)}")
+            raise
+        finally:
+            self._workbook = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 def save_to_excel(products_data, filename="products.xlsx"):
     """
     Сохранение данных о товарах в Excel-файл.
 
     Аргументы:
-        products_data (list): Список словарей с данными о товарах.
+        products_data (list): Список записей о товарах (Product).
         filename (str): Имя выходного Excel-файла.
 
     Исключения:
         Exception: Если создание Excel-файла не удалось.
     """
-    try:
-        df = pd.DataFrame(products_data)
-        with pd.ExcelWriter(filename, engine="openpyxl", mode="w") as writer:
-            df.to_excel(writer, sheet_name="Товары", index=False)
-
-        workbook = load_workbook(filename)
-        worksheet = workbook["Товары"]
-
-        # Настройка ширины столбцов и стилизация заголовков
-        for col_idx, col_name in enumerate(df.columns, start=1):
-            column_letter = get_column_letter(col_idx)
-            worksheet.column_dimensions[column_letter].width = 20
-            worksheet[f"{column_letter}1"].font = Font(bold=True)
-            worksheet[f"{column_letter}1"].alignment = Alignment(horizontal="center")
-
-        workbook.save(filename)
-        logger.info(f"Excel-файл сохранен: {filename}")
-    except Exception as e:
-        logger.error(f"Ошибка сохранения Excel: {str(e)}")
-        raise
+    extra_fields = list(dict.fromkeys(field for product in products_data for field in product.extra or ()))
+    with ExcelStreamWriter(filename, extra_fields) as writer:
+        writer.write_rows(products_data)
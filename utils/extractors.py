@@ -0,0 +1,286 @@
+"""
+Модуль с движками извлечения данных о товарах из HTML страницы категории.
+Этот модуль:
+- Предоставляет движки на BeautifulSoup (эталонный), lxml и selectolax.
+- Использует заранее скомпилированные XPath-выражения и регулярные выражения.
+- Находит все поля карточки товара за один проход по ее поддереву.
+- Возвращает одинаковые записи о товарах (utils.product.Product) для всех движков.
+- Определяет пагинацию категории по разметке первой страницы: количество товаров,
+  номер последней страницы и размер страницы.
+"""
+
+import re
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from utils.product import Product, parse_code, parse_price, parse_rating, parse_reviews
+from utils.logger import logger
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+BASE_URL = "https://www.vseinstrumenti.ru"
+ENGINES = ("auto", "selectolax", "lxml", "bs4")
+
+CODE_RE = re.compile(r'\d+')
+DEFAULT_PAGE_SIZE = 40
+
+PAGINATION_MARKER = 'data-qa="pagination"'
+PAGE_LINK_RE = re.compile(r'href="[^"]*/page(\d+)/')
+PRODUCTS_COUNT_RE = re.compile(r'data-qa="category-products-count"[^>]*>([^<]*)<')
+
+# Поля карточки: (тег, значение data-qa)
+CODE_QA = ("p", "product-code-text")
+NAME_QA = ("a", "product-name")
+PRICE_QA = ("p", "product-price-current")
+RATING_QA = ("a", "product-rating")
+TILE_FIELDS = (CODE_QA, NAME_QA, PRICE_QA, RATING_QA)
+
+TILE_CSS = 'div[data-qa="products-tile"]'
+FIELDS_CSS = ", ".join(f'{tag}[data-qa="{qa}"]' for tag, qa in TILE_FIELDS)
+RATING_PARTS_CSS = 'input[name="rating"], span'
+
+if lxml_html is not None:
+    TILES_XPATH = etree.XPath('//div[@data-qa="products-tile"]')
+    FIELDS_XPATH = etree.XPath(" | ".join(f'.//{tag}[@data-qa="{qa}"]' for tag, qa in TILE_FIELDS))
+    RATING_PARTS_XPATH = etree.XPath('.//input[@name="rating"] | .//span')
+
+
+def make_product(code_text, name, href, price, rating_value, reviews_text):
+    """
+    Сборка записи о товаре из сырых значений полей карточки.
+
+    Аргументы:
+        code_text (str): Текст с артикулом или None.
+        name (str): Название товара или None.
+        href (str): Ссылка на товар или None.
+        price (str): Текст цены или None.
+        rating_value (str): Значение рейтинга или None.
+        reviews_text (str): Текст с количеством отзывов или None.
+
+    Возвращает:
+        Product: Данные о товаре.
+    """
+    return Product(
+        parse_code(code_text),
+        name.strip() if name is not None else None,
+        urljoin(BASE_URL, href) if href is not None else None,
+        parse_price(price),
+        parse_rating(rating_value),
+        parse_reviews(reviews_text),
+    )
+
+
+def extract_from_soup(soup):
+    """
+    Извлечение данных о товарах из готового дерева BeautifulSoup (эталонный движок).
+
+    Аргументы:
+        soup: Объект BeautifulSoup с HTML страницы.
+
+    Возвращает:
+        list: Список записей о товарах (Product).
+    """
+    products_data = []
+    for product in soup.find_all("div", attrs={"data-qa": "products-tile"}):
+        try:
+            code_elem = product.find("p", attrs={"data-qa": "product-code-text"})
+            name_elem = product.find("a", attrs={"data-qa": "product-name"})
+            price_elem = product.find("p", attrs={"data-qa": "product-price-current"})
+            rating_container = product.find("a", attrs={"data-qa": "product-rating"})
+            rating_value = reviews_text = None
+            if rating_container:
+                rating_input = rating_container.find("input", attrs={"name": "rating"})
+                if rating_input and rating_input.has_attr("value"):
+                    rating_value = rating_input["value"]
+                reviews_elem = rating_container.find("span")
+                if reviews_elem:
+                    reviews_text = reviews_elem.text
+
+            products_data.append(make_product(
+                code_elem.text if code_elem else None,
+                name_elem.text if name_elem else None,
+                name_elem["href"] if name_elem and name_elem.has_attr("href") else None,
+                price_elem.text if price_elem else None,
+                rating_value,
+                reviews_text,
+            ))
+        except Exception as e:
+            logger.error(f"Ошибка парсинга товара: {str(e)}")
+    return products_data
+
+
+def extract_bs4(html):
+    return extract_from_soup(BeautifulSoup(html, "html.parser"))
+
+
+def extract_lxml(html):
+    """
+    Извлечение данных о товарах движком lxml.
+
+    Аргументы:
+        html (str): HTML-код страницы.
+
+    Возвращает:
+        list: Список записей о товарах (Product).
+    """
+    products_data = []
+    for tile in TILES_XPATH(lxml_html.fromstring(html)):
+        try:
+            found = {}
+            for elem in FIELDS_XPATH(tile):
+                found.setdefault((elem.tag, elem.get("data-qa")), elem)
+
+            rating_value = reviews_text = None
+            rating_container = found.get(RATING_QA)
+            if rating_container is not None:
+                rating_seen = False
+                for elem in RATING_PARTS_XPATH(rating_container):
+                    if elem.tag == "span":
+                        if reviews_text is None:
+                            reviews_text = "".join(elem.itertext())
+                    elif not rating_seen:
+                        rating_seen = True
+                        rating_value = elem.get("value")
+
+            code_elem = found.get(CODE_QA)
+            name_elem = found.get(NAME_QA)
+            price_elem = found.get(PRICE_QA)
+            products_data.append(make_product(
+                "".join(code_elem.itertext()) if code_elem is not None else None,
+                "".join(name_elem.itertext()) if name_elem is not None else None,
+                name_elem.get("href") if name_elem is not None else None,
+                "".join(price_elem.itertext()) if price_elem is not None else None,
+                rating_value,
+                reviews_text,
+            ))
+        except Exception as e:
+            logger.error(f"Ошибка парсинга товара: {str(e)}")
+    return products_data
+
+
+def extract_selectolax(html):
+    """
+    Извлечение данных о товарах движком selectolax (lexbor).
+
+    Аргументы:
+        html (str): HTML-код страницы.
+
+    Возвращает:
+        list: Список записей о товарах (Product).
+    """
+    products_data = []
+    for tile in LexborHTMLParser(html).css(TILE_CSS):
+        try:
+            found = {}
+            for node in tile.css(FIELDS_CSS):
+                found.setdefault((node.tag, node.attributes.get("data-qa")), node)
+
+            rating_value = reviews_text = None
+            rating_container = found.get(RATING_QA)
+            if rating_container is not None:
+                rating_seen = False
+                for node in rating_container.css(RATING_PARTS_CSS):
+                    if node.tag == "span":
+                        if reviews_text is None:
+                            reviews_text = node.text(deep=True)
+                    elif not rating_seen:
+                        rating_seen = True
+                        rating_value = node.attributes.get("value")
+
+            code_elem = found.get(CODE_QA)
+            name_elem = found.get(NAME_QA)
+            price_elem = found.get(PRICE_QA)
+            products_data.append(make_product(
+                code_elem.text(deep=True) if code_elem is not None else None,
+                name_elem.text(deep=True) if name_elem is not None else None,
+                name_elem.attributes.get("href") if name_elem is not None else None,
+                price_elem.text(deep=True) if price_elem is not None else None,
+                rating_value,
+                reviews_text,
+            ))
+        except Exception as e:
+            logger.error(f"Ошибка парсинга товара: {str(e)}")
+    return products_data
+
+
+EXTRACTORS = {
+    "bs4": extract_bs4,
+    "lxml": extract_lxml if lxml_html is not None else None,
+    "selectolax": extract_selectolax if LexborHTMLParser is not None else None,
+}
+
+
+def get_extractor(engine="auto"):
+    """
+    Выбор движка извлечения. В режиме "auto" выбирается самый быстрый из установленных.
+
+    Аргументы:
+        engine (str): Название движка: "auto", "selectolax", "lxml" или "bs4".
+
+    Возвращает:
+        callable: Функция, принимающая HTML-код и возвращающая список товаров.
+
+    Исключения:
+        ValueError: Если движок неизвестен или не установлен.
+    """
+    if engine == "auto":
+        for name in ("selectolax", "lxml", "bs4"):
+            if EXTRACTORS[name] is not None:
+                return EXTRACTORS[name]
+    if engine not in EXTRACTORS:
+        raise ValueError(f"Неизвестный движок парсинга: {engine}")
+    if EXTRACTORS[engine] is None:
+        raise ValueError(f"Движок парсинга не установлен: {engine}")
+    return EXTRACTORS[engine]
+
+
+def extract_products(html, engine="auto"):
+    """
+    Извлечение данных о товарах из HTML-кода страницы.
+
+    Аргументы:
+        html (str): HTML-код страницы.
+        engine (str): Название движка.
+
+    Возвращает:
+        list: Список записей о товарах (Product).
+    """
+    return get_extractor(engine)(html)
+
+
+def parse_pagination(html):
+    """
+    Определение пагинации категории по разметке первой страницы.
+    Количество страниц рассчитывается по общему количеству товаров и размеру страницы,
+    а если количество товаров не указано - по последней ссылке блока пагинации.
+
+    Аргументы:
+        html (str): HTML-код первой страницы категории.
+
+    Возвращает:
+        dict: Количество товаров ("products"), страниц ("pages") и товаров на странице ("page_size").
+        Неизвестные значения - None.
+    """
+    page_size = html.count('data-qa="products-tile"') or None
+    products = None
+    match = PRODUCTS_COUNT_RE.search(html)
+    if match:
+        digits = "".join(CODE_RE.findall(match.group(1)))
+        products = int(digits) if digits else None
+
+    pages = None
+    start = html.find(PAGINATION_MARKER)
+    if start != -1:
+        end = html.find("</div>", start)
+        page_numbers = [int(number) for number in PAGE_LINK_RE.findall(html, start, end if end != -1 else None)]
+        pages = max(page_numbers, default=1)
+    if products is not None and page_size:
+        pages = max(1, -(-products // page_size))
+    return {"products": products, "pages": pages, "page_size": page_size}
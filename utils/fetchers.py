@@ -0,0 +1,271 @@
+"""
+Модуль с бэкендами загрузки страниц.
+Этот модуль:
+- Загружает HTML напрямую через HTTP-клиент с пулом keep-alive соединений и сжатием gzip/brotli.
+- Загружает страницы через браузер Selenium с ожиданием разметки карточек товаров.
+- Использует HTTP по умолчанию и переключается на Selenium, только если в ответе нет карточек товаров
+  или сайт ответил 403; на 429 и 5xx сообщает о блокировке, чтобы пул снизил скорость.
+- Берет браузеры из пула браузеров (utils.browser_pool) и возвращает их туда после задания.
+- Сообщает об ошибках загрузки исключением FetchError с признаком блокировки со стороны сайта
+  (HTTP 403/429/5xx или страница без карточек товаров), чтобы пул мог повторить загрузку и снизить скорость.
+- Все бэкенды синхронны и вызываются из потоков пула загрузки.
+"""
+
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from utils.selenium_driver import USER_AGENT
+from utils.browser_pool import shared_browser_pool
+from utils.metrics import metrics
+from utils.logger import logger
+
+TILE_SELECTOR = 'div[data-qa="products-tile"]'
+TILE_MARKER = 'data-qa="products-tile"'
+PAGE_TIMEOUT = 15
+FETCHER_BACKENDS = ("auto", "http", "selenium")
+# Ответы, которыми сайт ограничивает частоту запросов или блокирует клиента
+BLOCKED_STATUSES = (403, 429)
+
+HTTP_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+    # brotli распаковывается urllib3, если установлен пакет brotli
+    "Accept-Encoding": "gzip, deflate, br",
+}
+
+class FetchError(Exception):
+    """
+    Ошибка загрузки страницы, после которой загрузку можно повторить.
+    Признак blocked означает, что сайт ограничивает запросы и скорость нужно снизить.
+    """
+    def __init__(self, message, status=None, blocked=False):
+        super().__init__(message)
+        self.status = status
+        self.blocked = blocked
+
+
+def is_blocked_status(status):
+    """
+    Проверка, что HTTP-статус означает ограничение запросов со стороны сайта.
+
+    Аргументы:
+        status (int): HTTP-статус.
+
+    Возвращает:
+        bool: True для 403, 429 и 5xx.
+    """
+    return status in BLOCKED_STATUSES or status >= 500
+
+
+class HttpFetcher:
+    """
+    Загрузка страниц через общую HTTP-сессию с пулом keep-alive соединений.
+    Время запросов учитывается в метриках под этапом stage.
+    """
+    def __init__(self, pool_size=10, timeout=PAGE_TIMEOUT, stage="fetch_http"):
+        self.timeout = timeout
+        self.stage = stage
+        self.session = requests.Session()
+        self.session.headers.update(HTTP_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def start(self):
+        pass
+
+    def request(self, url):
+        """
+        Выполнение запроса без интерпретации результата.
+
+        Аргументы:
+            url (str): URL для загрузки.
+
+        Возвращает:
+            tuple: HTTP-статус и HTML-код (None, если страница была перенаправлена на другой путь).
+        """
+        with metrics.timer(self.stage):
+            response = self.session.get(url, timeout=self.timeout)
+        if response.history and _path(response.url) != _path(url):
+            # Несуществующие страницы пагинации перенаправляются на другие страницы категории
+            logger.warning(f"Страница перенаправлена: {url} -> {response.url}")
+            return response.status_code, None
+        return response.status_code, response.text
+
+    def fetch(self, url):
+        """
+        Загрузка страницы.
+
+        Аргументы:
+            url (str): URL для загрузки.
+
+        Возвращает:
+            str: HTML-код страницы или None, если страница не существует.
+
+        Исключения:
+            FetchError: Если сервер вернул ошибку или страницу без карточек товаров.
+            requests.RequestException: При сетевой ошибке.
+        """
+        logger.info(f"Загрузка страницы (HTTP): {url}")
+        status, html = self.request(url)
+        if status == 404 or (status == 200 and html is None):
+            logger.warning(f"Страница не существует: {url}")
+            return None
+        if status != 200:
+            raise FetchError(f"HTTP {status}", status, blocked=is_blocked_status(status))
+        if TILE_MARKER not in html:
+            raise FetchError("карточки товаров не найдены (возможно, защита от ботов)", status, blocked=True)
+        logger.info(f"Страница успешно загружена: {url}")
+        return html
+
+    def close(self):
+        self.session.close()
+
+
+class SeleniumFetcher:
+    """
+    Загрузка страниц через браузер Selenium. Браузер берется из пула при первом обращении
+    и возвращается в пул при закрытии загрузчика.
+    """
+    def __init__(self, browser_pool=None, timeout=PAGE_TIMEOUT):
+        self.timeout = timeout
+        self.browser_pool = browser_pool or shared_browser_pool()
+        self.driver = None
+
+    def start(self):
+        if self.driver is None:
+            self.driver = self.browser_pool.acquire()
+
+    def fetch(self, url):
+        """
+        Загрузка страницы в браузере с ожиданием карточек товаров.
+
+        Аргументы:
+            url (str): URL для загрузки.
+
+        Возвращает:
+            str: HTML-код страницы или None, если страница перенаправлена на другой путь.
+
+        Исключения:
+            FetchError: Если карточки товаров не появились за время ожидания.
+            WebDriverException: При ошибке браузера.
+        """
+        self.start()
+        try:
+            logger.info(f"Загрузка страницы: {url}")
+            with metrics.timer("selenium_get"):
+                self.driver.get(url)
+            if _path(self.driver.current_url) != _path(url):
+                logger.warning(f"Страница перенаправлена: {url} -> {self.driver.current_url}")
+                return None
+            with metrics.timer("selenium_wait"):
+                WebDriverWait(self.driver, self.timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, TILE_SELECTOR))
+                )
+            with metrics.timer("selenium_page_source"):
+                html = self.driver.page_source
+            logger.info(f"Страница успешно загружена: {url}")
+            return html
+        except TimeoutException:
+            raise FetchError("карточки товаров не найдены (возможно, защита от ботов)", blocked=True)
+        except WebDriverException:
+            # Браузер возвращается в пул с проверкой: неработоспособный закрывается,
+            # и следующая попытка получит новый
+            self.browser_pool.release(self.driver)
+            self.driver = None
+            raise
+        finally:
+            if self.driver is not None and self.browser_pool.page_done(self.driver):
+                self.browser_pool.release(self.driver, recycle=True)
+                self.driver = None
+
+    def close(self):
+        if self.driver is not None:
+            self.browser_pool.release(self.driver)
+            self.driver = None
+
+
+class HybridFetcher:
+    """
+    Загрузка страниц через HTTP с переключением на Selenium,
+    если в ответе нет разметки карточек товаров (например, страница защиты от ботов) или сайт ответил 403.
+    Ответы 429 и 5xx означают ограничение частоты, которое браузер не обходит: они передаются
+    пулу как блокировка, чтобы он повторил загрузку позже и снизил скорость.
+    """
+    def __init__(self, http_fetcher, browser_pool=None):
+        self.http = http_fetcher
+        self.selenium = SeleniumFetcher(browser_pool)
+
+    def start(self):
+        pass
+
+    def fetch(self, url):
+        """
+        Загрузка страницы.
+
+        Аргументы:
+            url (str): URL для загрузки.
+
+        Возвращает:
+            str: HTML-код страницы или None, если страница не существует.
+
+        Исключения:
+            FetchError: Если сайт ответил 429 или 5xx (blocked=True).
+            FetchError, WebDriverException: Если страницу не удалось загрузить и через Selenium.
+        """
+        try:
+            status, html = self.http.request(url)
+        except Exception as e:
+            logger.warning(f"Ошибка HTTP-загрузки {url}: {str(e)}, загрузка через Selenium")
+            return self.selenium.fetch(url)
+
+        if status == 404 or (status == 200 and html is None):
+            logger.warning(f"Страница не существует: {url}")
+            return None
+        if status == 200 and TILE_MARKER in html:
+            logger.info(f"Страница успешно загружена (HTTP): {url}")
+            return html
+        if status != 403 and is_blocked_status(status):
+            raise FetchError(f"HTTP {status}", status, blocked=True)
+        logger.info(f"Карточки товаров не найдены в HTTP-ответе ({status}), загрузка через Selenium: {url}")
+        return self.selenium.fetch(url)
+
+    def close(self):
+        self.selenium.close()
+        self.http.close()
+
+
+def fetcher_factory(backend="auto", pool_size=10, browser_pool=None):
+    """
+    Создание фабрики загрузчиков для пула загрузки.
+    HTTP-сессия общая для всех загрузчиков, браузеры - у каждого свои, из общего пула браузеров.
+    Закрытие общей HTTP-сессии повторно безопасно.
+
+    Аргументы:
+        backend (str): Бэкенд загрузки: "auto", "http" или "selenium".
+        pool_size (int): Размер пула HTTP-соединений.
+        browser_pool (BrowserPool): Пул браузеров Selenium (None - общий пул процесса).
+
+    Возвращает:
+        callable: Функция создания загрузчика.
+
+    Исключения:
+        ValueError: Если бэкенд не поддерживается.
+    """
+    if backend not in FETCHER_BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд загрузки: {backend}")
+    if backend == "selenium":
+        return lambda: SeleniumFetcher(browser_pool)
+    http_fetcher = HttpFetcher(pool_size=pool_size)
+    if backend == "http":
+        return lambda: http_fetcher
+    return lambda: HybridFetcher(http_fetcher, browser_pool)
+
+
+def _path(url):
+    return urlparse(url).path.rstrip('/')
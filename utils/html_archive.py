@@ -0,0 +1,175 @@
+"""
+Модуль архива HTML-кода загруженных страниц.
+Этот модуль:
+- Сохраняет HTML страниц категорий в сегментные файлы, которые только дописываются. Каждая страница -
+  отдельный кадр zstd, поэтому любую страницу можно прочитать, не распаковывая остальные.
+- Начинает новый сегмент в каждом запуске и по достижении максимального размера сегмента;
+  страницы сразу пишутся на диск и не накапливаются в памяти.
+- Ведет индекс смещений (index.jsonl): URL страницы, сегмент, смещение и длина кадра, время сохранения.
+  Строка индекса пишется после данных, поэтому оборванная при сбое запись не попадает в индекс.
+- Читает страницы из сегментов через mmap, чтобы повторный парсинг архива (reparse.py)
+  не загружал сегменты в память целиком.
+"""
+
+import json
+import mmap
+import threading
+import time
+from pathlib import Path
+from utils.page_cache import normalize_url
+from utils.logger import logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_ARCHIVE_DIR = ".html_archive"
+DEFAULT_SEGMENT_BYTES = 256 * 1024 * 1024
+DEFAULT_LEVEL = 3
+INDEX_FILE = "index.jsonl"
+
+
+def segment_number(path):
+    """
+    Аргументы:
+        path (Path): Путь к файлу сегмента ("segment-00001.zst").
+
+    Возвращает:
+        int: Номер сегмента.
+    """
+    return int(path.stem.rsplit("-", 1)[-1])
+
+
+class HtmlArchive:
+    """
+    Архив страниц, в который страницы только дописываются. Потокобезопасен: используется из потоков пула загрузки.
+    Сегменты предыдущих запусков не изменяются.
+    """
+    def __init__(self, archive_dir=DEFAULT_ARCHIVE_DIR, segment_bytes=DEFAULT_SEGMENT_BYTES, level=DEFAULT_LEVEL):
+        """
+        Аргументы:
+            archive_dir (str): Каталог архива.
+            segment_bytes (int): Максимальный размер сегмента в байтах.
+            level (int): Уровень сжатия zstd.
+
+        Исключения:
+            ValueError: Если не установлен пакет zstandard.
+        """
+        if zstandard is None:
+            raise ValueError("Для архива страниц требуется пакет zstandard")
+        self.archive_dir = Path(archive_dir)
+        self.segment_bytes = segment_bytes
+        self.pages = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._lock = threading.Lock()
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self._next_segment = max(map(segment_number, self.archive_dir.glob("segment-*.zst")), default=0) + 1
+        self._segment = None
+        self._segment_name = None
+        self._offset = 0
+        self._index = open(self.archive_dir / INDEX_FILE, "a", encoding="utf-8")
+
+    def _open_segment(self):
+        if self._segment:
+            self._segment.close()
+        self._segment_name = f"segment-{self._next_segment:05d}.zst"
+        self._next_segment += 1
+        self._segment = open(self.archive_dir / self._segment_name, "xb")
+        self._offset = 0
+
+    def put(self, url, html):
+        """
+        Сохранение страницы в архив.
+
+        Аргументы:
+            url (str): URL страницы.
+            html (str): HTML-код страницы.
+        """
+        data = html.encode("utf-8")
+        with self._lock:
+            # Сжатие под блокировкой: объект ZstdCompressor нельзя использовать из нескольких потоков одновременно
+            frame = self._compressor.compress(data)
+            if self._segment is None or (self._offset and self._offset + len(frame) > self.segment_bytes):
+                self._open_segment()
+            self._segment.write(frame)
+            self._segment.flush()
+            entry = {
+                "url": url,
+                "segment": self._segment_name,
+                "offset": self._offset,
+                "length": len(frame),
+                "size": len(data),
+                "time": round(time.time(), 3),
+            }
+            self._index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._index.flush()
+            self._offset += len(frame)
+            self.pages += 1
+            self.raw_bytes += len(data)
+            self.stored_bytes += len(frame)
+
+    def close(self):
+        with self._lock:
+            if self._segment:
+                self._segment.close()
+                self._segment = None
+            self._index.close()
+
+    def log_stats(self):
+        if self.pages:
+            logger.info(
+                f"Архив страниц {self.archive_dir}: сохранено {self.pages}, "
+                f"{self.raw_bytes / 1024 / 1024:.1f} МБ -> {self.stored_bytes / 1024 / 1024:.1f} МБ "
+                f"(сжатие в {self.raw_bytes / self.stored_bytes:.1f} раза)"
+            )
+
+
+def read_index(archive_dir):
+    """
+    Чтение индекса архива. Если страница сохранялась несколько раз, берется последняя версия,
+    а место страницы в порядке обхода определяется первым сохранением.
+
+    Аргументы:
+        archive_dir (str): Каталог архива.
+
+    Возвращает:
+        list: Записи индекса (словари url, segment, offset, length, size, time).
+
+    Исключения:
+        FileNotFoundError: Если в каталоге нет индекса архива.
+    """
+    entries = {}
+    with open(Path(archive_dir) / INDEX_FILE, encoding="utf-8") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Строка, оборванная при сбое записи
+                continue
+            entries[normalize_url(entry["url"])] = entry
+    return list(entries.values())
+
+
+def read_pages(segment_path, spans):
+    """
+    Чтение страниц одного сегмента через mmap.
+
+    Аргументы:
+        segment_path (str): Путь к файлу сегмента.
+        spans (list): Пары (смещение, длина) кадров страниц.
+
+    Возвращает:
+        Iterator[str]: HTML-код страниц в порядке spans.
+
+    Исключения:
+        ValueError: Если не установлен пакет zstandard.
+    """
+    if zstandard is None:
+        raise ValueError("Для чтения архива страниц требуется пакет zstandard")
+    decompressor = zstandard.ZstdDecompressor()
+    with open(segment_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for offset, length in spans:
+            yield decompressor.decompress(mapped[offset:offset + length]).decode("utf-8")
@@ -0,0 +1,275 @@
+"""
+Модуль метрик парсинга.
+Этот модуль:
+- Собирает счетчики (страницы, товары, повторы, ошибки) и гистограммы времени этапов
+  (загрузка, ожидание браузера, парсинг, запись), потокобезопасно для потоков пула загрузки.
+- Измеряет этапы контекстным менеджером timer().
+- Формирует итоговую сводку запуска в JSON со скоростью страниц и товаров в секунду.
+- Экспортирует метрики в текстовом формате Prometheus в файл или по HTTP (/metrics).
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from utils.logger import logger
+
+METRICS_PREFIX = "vi_parser"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+
+# Описания счетчиков для экспорта в Prometheus
+COUNTERS = {
+    "pages_fetched": "Страницы категории, загруженные из сети",
+    "pages_cached": "Страницы категории, прочитанные из кеша",
+    "pages_failed": "Страницы категории, не загруженные после всех попыток",
+    "retries": "Повторные попытки загрузки",
+    "blocked": "Ответы, которыми сайт ограничивает запросы",
+    "products": "Спарсенные товары",
+    "duplicates": "Отброшенные дубликаты товаров",
+    "detail_pages": "Загруженные детальные страницы товаров",
+    "rows_written": "Строки, записанные в выходной файл",
+}
+
+
+class Histogram:
+    """
+    Гистограмма длительностей этапа с фиксированными границами BUCKETS.
+    """
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def quantile(self, q):
+        """
+        Оценка квантиля по гистограмме: верхняя граница интервала, в который он попадает.
+
+        Аргументы:
+            q (float): Квантиль от 0 до 1.
+
+        Возвращает:
+            float: Оценка квантиля в секундах.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else 0.0,
+            "min": round(self.min or 0.0, 4),
+            "max": round(self.max, 4),
+            "p50": round(self.quantile(0.5), 4),
+            "p95": round(self.quantile(0.95), 4),
+        }
+
+
+class Metrics:
+    """
+    Реестр метрик запуска: счетчики и гистограммы этапов.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Сброс метрик перед новым запуском.
+        """
+        with self._lock:
+            self.counters = dict.fromkeys(COUNTERS, 0)
+            self.stages = {}
+            self.started = time.time()
+            self._started = time.perf_counter()
+
+    def inc(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = Histogram()
+            self.stages[stage].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Измерение длительности этапа.
+
+        Аргументы:
+            stage (str): Название этапа.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def rate(self, name):
+        """
+        Средняя скорость счетчика с начала запуска.
+
+        Аргументы:
+            name (str): Название счетчика.
+
+        Возвращает:
+            float: Значение в секунду.
+        """
+        elapsed = self.elapsed()
+        return self.counters.get(name, 0) / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """
+        Сводка запуска.
+
+        Возвращает:
+            dict: Время запуска, счетчики, скорости и статистика времени этапов.
+        """
+        with self._lock:
+            elapsed = self.elapsed()
+            counters = dict(self.counters)
+            stages = {stage: histogram.summary() for stage, histogram in sorted(self.stages.items())}
+        pages = counters["pages_fetched"] + counters["pages_cached"]
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "elapsed": round(elapsed, 3),
+            "counters": counters,
+            "pages_per_second": round(pages / elapsed, 3) if elapsed > 0 else 0.0,
+            "products_per_second": round(counters["products"] / elapsed, 3) if elapsed > 0 else 0.0,
+            "stages": stages,
+        }
+
+    def write_json(self, path):
+        """
+        Запись сводки запуска в JSON-файл.
+
+        Аргументы:
+            path (str): Путь к файлу.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, ensure_ascii=False, indent=2)
+        logger.info(f"Сводка метрик сохранена: {path}")
+
+    def prometheus_text(self):
+        """
+        Метрики в текстовом формате Prometheus.
+
+        Возвращает:
+            str: Текст для /metrics или textfile-коллектора node_exporter.
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            stages = {stage: (list(h.buckets), h.count, h.sum) for stage, h in self.stages.items()}
+            elapsed = self.elapsed()
+        lines = []
+        for name, value in counters.items():
+            metric = f"{METRICS_PREFIX}_{name}_total"
+            lines.append(f"# HELP {metric} {COUNTERS.get(name, name)}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        metric = f"{METRICS_PREFIX}_stage_seconds"
+        lines.append(f"# HELP {metric} Длительность этапов парсинга")
+        lines.append(f"# TYPE {metric} histogram")
+        for stage, (buckets, count, total) in sorted(stages.items()):
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, buckets):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {count}')
+        lines.append(f"# HELP {METRICS_PREFIX}_run_seconds Время с начала запуска")
+        lines.append(f"# TYPE {METRICS_PREFIX}_run_seconds gauge")
+        lines.append(f"{METRICS_PREFIX}_run_seconds {elapsed:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Запись метрик в файл в формате Prometheus. Файл заменяется атомарно,
+        чтобы коллектор не прочитал его частично записанным.
+
+        Аргументы:
+            path (str): Путь к файлу.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def log_summary(self):
+        summary = self.summary()
+        counters = summary["counters"]
+        logger.info(
+            f"Метрики: {summary['elapsed']:.1f} с, страниц {counters['pages_fetched']} (+{counters['pages_cached']} из кеша), "
+            f"товаров {counters['products']} ({summary['products_per_second']:.1f}/с), "
+            f"дубликатов {counters['duplicates']}, повторов {counters['retries']}, ошибок {counters['pages_failed']}"
+        )
+        for stage, stats in summary["stages"].items():
+            logger.info(
+                f"Этап {stage}: {stats['count']} раз, всего {stats['total']:.2f} с, "
+                f"среднее {stats['mean'] * 1000:.1f} мс, p95 {stats['p95'] * 1000:.0f} мс"
+            )
+
+
+# Общий реестр метрик процесса
+metrics = Metrics()
+
+
+def start_metrics_server(port, host="127.0.0.1", registry=metrics):
+    """
+    Запуск HTTP-сервера с метриками в формате Prometheus (GET /metrics) в фоновом потоке.
+
+    Аргументы:
+        port (int): Порт.
+        host (str): Адрес.
+        registry (Metrics): Реестр метрик.
+
+    Возвращает:
+        ThreadingHTTPServer: Сервер; останавливается методом shutdown().
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Метрики Prometheus доступны по адресу http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,154 @@
+"""
+Модуль дискового кеша загруженных страниц.
+Этот модуль:
+- Хранит HTML страниц в файлах, имена которых - хеш нормализованного URL.
+- Считает записи устаревшими по истечении заданного времени жизни (TTL).
+- Ограничивает общий размер кеша, удаляя давно не использованные записи (LRU).
+- Опционально сжимает страницы gzip.
+- Считает попадания, промахи и удаления для отчета в конце запуска.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse, parse_qsl, urlencode
+from utils.logger import logger
+
+DEFAULT_CACHE_DIR = ".page_cache"
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def normalize_url(url):
+    """
+    Нормализация URL для ключа кеша: схема и хост в нижнем регистре,
+    без фрагмента, с отсортированными параметрами запроса и завершающим слешем.
+
+    Аргументы:
+        url (str): URL страницы.
+
+    Возвращает:
+        str: Нормализованный URL.
+    """
+    parsed = urlparse(url.strip())
+    path = parsed.path or "/"
+    if not path.endswith("/") and "." not in path.rsplit("/", 1)[-1]:
+        path += "/"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return parsed._replace(
+        scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), path=path, query=query, fragment=""
+    ).geturl()
+
+
+class PageCache:
+    """
+    Дисковый кеш страниц с TTL и вытеснением давно не использованных записей.
+    Потокобезопасен: используется из потоков пула загрузки.
+    Время сохранения хранится в mtime файла, время последнего обращения - в atime.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, compress=False):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._size = sum(path.stat().st_size for path in self._entries())
+
+    def _entries(self):
+        return self.cache_dir.glob("*/*.html*")
+
+    def _path(self, url, compressed):
+        key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / (f"{key}.html.gz" if compressed else f"{key}.html")
+
+    def get(self, url, ignore_ttl=False):
+        """
+        Чтение страницы из кеша.
+
+        Аргументы:
+            url (str): URL страницы.
+            ignore_ttl (bool): Возвращать и устаревшие записи (режим офлайн).
+
+        Возвращает:
+            str: HTML-код страницы или None, если записи нет или она устарела.
+        """
+        now = time.time()
+        for compressed in (self.compress, not self.compress):
+            path = self._path(url, compressed)
+            try:
+                stat = path.stat()
+                if not ignore_ttl and now - stat.st_mtime > self.ttl:
+                    break
+                data = path.read_bytes()
+                # Обновляем время обращения для LRU, сохраняя время записи
+                os.utime(path, (now, stat.st_mtime))
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                self.hits += 1
+            return (gzip.decompress(data) if compressed else data).decode("utf-8")
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, url, html):
+        """
+        Сохранение страницы в кеш с вытеснением старых записей при превышении размера.
+
+        Аргументы:
+            url (str): URL страницы.
+            html (str): HTML-код страницы.
+        """
+        data = html.encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data, compresslevel=5)
+        path = self._path(url, self.compress)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with self._lock:
+            old_size = path.stat().st_size if path.exists() else 0
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+        entries.sort()
+        # Освобождаем место с запасом, чтобы не вытеснять при каждой записи
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= size
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Возвращает:
+            dict: Счетчики попаданий, промахов и удалений и текущий размер кеша.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "bytes": self._size}
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info(
+            f"Кеш страниц: попаданий {stats['hits']}, промахов {stats['misses']}, "
+            f"удалено {stats['evictions']}, размер {stats['bytes'] / 1024 / 1024:.1f} МБ"
+        )
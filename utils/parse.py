@@ -1,123 +1,114 @@
 """
 Модуль для парсинга HTML-контента и извлечения данных о товарах.
 Этот модуль:
-- Загружает веб-страницы с помощью Selenium и парсит HTML с BeautifulSoup.
-- Извлекает данные о товарах: артикул (только цифры), название, URL, цену, рейтинг и отзывы.
+- Загружает веб-страницы выбранным загрузчиком в отдельном потоке и парсит HTML с BeautifulSoup.
+- Извлекает данные о товарах выбранным движком (см. utils.extractors): артикул (только цифры),
+  название, URL, цену, рейтинг и отзывы.
+- Отбрасывает повторяющиеся товары (см. utils.dedup) до учета лимита количества товаров.
 - Логирует ошибки и обновляет прогресс для интеграции с GUI.
 """
 
 import asyncio
-import re
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
+from utils.extractors import extract_products, extract_from_soup
 from utils.logger import logger
 
-async def get_page_content(driver, url):
+async def get_page_html(fetcher, url):
+    """
+    Загрузка HTML-кода страницы в отдельном потоке, не останавливая цикл событий.
+
+    Аргументы:
+        fetcher: Загрузчик страниц (см. utils.fetchers).
+        url (str): URL для загрузки.
+
+    Возвращает:
+        str: HTML-код страницы или None, если страница не существует.
+
+    Исключения:
+        FetchError: Если загрузка не удалась (см. utils.fetchers).
+    """
+    return await asyncio.to_thread(fetcher.fetch, url)
+
+async def get_page_content(fetcher, url):
     """
     Загрузка страницы и возврат ее спарсенного HTML-контента.
 
     Аргументы:
-        driver: Объект WebDriver Selenium.
+        fetcher: Загрузчик страниц (см. utils.fetchers).
         url (str): URL для загрузки.
 
     Возвращает:
-        BeautifulSoup: Спарсенный HTML-контент или None, если загрузка не удалась.
+        BeautifulSoup: Спарсенный HTML-контент или None, если страница не существует.
+
+    Исключения:
+        FetchError: Если загрузка не удалась (см. utils.fetchers).
     """
-    try:
-        logger.info(f"Загрузка страницы: {url}")
-        driver.get(url)
-        WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-qa="products-tile"]')))
-        html = driver.page_source
-        logger.info(f"Страница успешно загружена: {url}")
-        return BeautifulSoup(html, "html.parser")
-    except Exception as e:
-        logger.error(f"Ошибка загрузки страницы {url}: {str(e)}")
+    html = await get_page_html(fetcher, url)
+    if not html:
         return None
+    return BeautifulSoup(html, "html.parser")
 
-async def parse_products(soup, max_products, current_product_count, progress_handler=None):
+async def parse_products(page, max_products, current_product_count, progress_handler=None, engine="auto", dedup=None):
     """
-    Извлечение данных о товарах из спарсенного HTML.
+    Извлечение данных о товарах из HTML страницы.
 
     Аргументы:
-        soup: Объект BeautifulSoup с HTML страницы.
+        page: HTML-код страницы (str) или объект BeautifulSoup.
         max_products (int): Максимальное количество товаров для парсинга.
         current_product_count (int): Текущее количество спарсенных товаров.
         progress_handler: Объект для обновления прогресс-бара.
+        engine (str): Движок извлечения для HTML-кода (см. utils.extractors).
+        dedup (DedupIndex): Индекс повторов (None - без отбрасывания повторов).
 
     Возвращает:
         tuple: Список данных о товарах и обновленное количество товаров.
     """
-    products_data = []
-    if not soup:
-        return products_data, current_product_count
+    if not page:
+        return [], current_product_count
+
+    if isinstance(page, str):
+        products = extract_products(page, engine)
+    else:
+        products = extract_from_soup(page)
+    return collect_products(products, max_products, current_product_count, progress_handler, dedup)
 
-    products = soup.find_all("div", attrs={"data-qa": "products-tile"})
+def collect_products(products, max_products, current_product_count, progress_handler=None, dedup=None, skipped=None):
+    """
+    Отбор извлеченных товаров страницы с учетом лимита и обновление прогресса.
+    Повторы отбрасываются до учета лимита, поэтому лимит считает только уникальные товары.
+
+    Аргументы:
+        products (list): Товары, извлеченные со страницы.
+        max_products (int): Максимальное количество товаров для парсинга.
+        current_product_count (int): Текущее количество спарсенных товаров.
+        progress_handler: Объект для обновления прогресс-бара.
+        dedup (DedupIndex): Индекс повторов (None - без отбрасывания повторов).
+        skipped (list): Список, в который добавляются отброшенные повторы (None - не собирать).
+
+    Возвращает:
+        tuple: Список данных о товарах и обновленное количество товаров.
+    """
+    products_data = []
     if not products:
         logger.warning("Товары не найдены на странице")
         return products_data, current_product_count
 
-    logger.info(f"Найдено товаров на странице: {len(products)}")
+    duplicates = 0
     for product in products:
         if max_products > 0 and current_product_count >= max_products:
             break
-        try:
-            # Извлечение артикула (только цифры)
-            code_elem = product.find("p", attrs={"data-qa": "product-code-text"})
-            code = "Н/Д"
-            if code_elem:
-                code_text = code_elem.text.strip()
-                match = re.search(r'\d+', code_text)
-                if match:
-                    code = match.group()
-
-            # Извлечение названия и URL
-            name_elem = product.find("a", attrs={"data-qa": "product-name"})
-            name = name_elem.text.strip() if name_elem else "Н/Д"
-            url = (
-                urljoin("https://www.vseinstrumenti.ru", name_elem["href"])
-                if name_elem and name_elem.has_attr("href")
-                else "Н/Д"
-            )
-
-            # Извлечение цены
-            price_elem = product.find("p", attrs={"data-qa": "product-price-current"})
-            price = price_elem.text.strip() if price_elem else "Н/Д"
-
-            # Извлечение рейтинга и отзывов
-            rating_container = product.find("a", attrs={"data-qa": "product-rating"})
-            rating = "Н/Д"
-            reviews = "Н/Д"
-
-            if rating_container:
-                rating_input = rating_container.find("input", attrs={"name": "rating"})
-                if rating_input and rating_input.has_attr("value"):
-                    try:
-                        rating = f"{float(rating_input['value']):.2f}"
-                    except ValueError:
-                        pass
-
-                reviews_elem = rating_container.find("span")
-                if reviews_elem and reviews_elem.text.strip().isdigit():
-                    reviews = reviews_elem.text.strip()
-
-            products_data.append({
-                "Артикул": code,
-                "Название": name,
-                "URL": url,
-                "Цена": price,
-                "Рейтинг": rating,
-                "Отзывы": reviews,
-            })
-
-            current_product_count += 1
-            if progress_handler:
-                progress_handler.update(1)
-
-        except Exception as e:
-            logger.error(f"Ошибка парсинга товара: {str(e)}")
+        if dedup and not dedup.add(product):
+            duplicates += 1
+            if skipped is not None:
+                skipped.append(product)
             continue
-
-    return products_data, current_product_count
\ No newline at end of file
+        products_data.append(product)
+        current_product_count += 1
+        if progress_handler:
+            progress_handler.update(1)
+
+    if duplicates:
+        logger.info(f"Найдено товаров на странице: {len(products)}, из них дубликатов: {duplicates}")
+    else:
+        logger.info(f"Найдено товаров на странице: {len(products)}")
+    return products_data, current_product_count
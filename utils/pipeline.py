@@ -0,0 +1,134 @@
+"""
+Модуль конвейера парсинга страниц.
+Этот модуль:
+- Передает HTML загруженных страниц через ограниченную очередь в пул процессов парсинга.
+- Возвращает из процессов компактные записи (кортежи) вместо объектов товаров, чтобы уменьшить сериализацию.
+- Сдерживает загрузку, когда парсинг не успевает: при заполненной очереди новые страницы не загружаются.
+- Выдает результаты в порядке номеров страниц.
+- Измеряет время парсинга каждой страницы в процессе пула и передает его в метрики.
+- Парсит страницы архива (utils.html_archive), которые процесс пула читает из сегмента сам,
+  без передачи HTML между процессами.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import aclosing
+from concurrent.futures import ProcessPoolExecutor
+from utils.extractors import extract_products
+from utils.html_archive import read_pages
+from utils.product import Product
+from utils.metrics import metrics
+
+DEFAULT_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_QUEUE_SIZE = 8
+
+
+def parse_page(html, engine="auto"):
+    """
+    Парсинг одной страницы в процессе пула.
+
+    Аргументы:
+        html (str): HTML-код страницы.
+        engine (str): Движок извлечения.
+
+    Возвращает:
+        list: Кортежи значений основных полей товаров (см. Product.record).
+    """
+    return [product.record() for product in extract_products(html, engine)]
+
+
+def _parse_page_timed(html, engine="auto"):
+    # Время измеряется внутри процесса пула, без ожидания в очереди и передачи данных
+    started = time.perf_counter()
+    records = parse_page(html, engine)
+    return time.perf_counter() - started, records
+
+
+def parse_archived(segment_path, spans, engine="auto"):
+    """
+    Парсинг страниц одного сегмента архива в процессе пула.
+
+    Аргументы:
+        segment_path (str): Путь к файлу сегмента.
+        spans (list): Пары (смещение, длина) страниц в сегменте.
+        engine (str): Движок извлечения.
+
+    Возвращает:
+        list: Для каждой страницы - список кортежей значений основных полей товаров (см. Product.record).
+    """
+    return [parse_page(html, engine) for html in read_pages(segment_path, spans)]
+
+
+def create_parse_executor(parse_workers=DEFAULT_PARSE_WORKERS):
+    """
+    Создание пула процессов парсинга.
+
+    Аргументы:
+        parse_workers (int): Количество процессов (0 - парсинг в потоке без отдельных процессов).
+
+    Возвращает:
+        ProcessPoolExecutor: Пул процессов или None для парсинга в потоке.
+    """
+    if parse_workers <= 0:
+        return None
+    return ProcessPoolExecutor(max_workers=parse_workers)
+
+
+async def parse_pages(pages, executor=None, engine="auto", queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Параллельный парсинг загруженных страниц.
+    Страницы отправляются в пул по мере загрузки; в очереди одновременно находится
+    не больше queue_size страниц, поэтому потребление памяти не растет,
+    даже если загрузка опережает парсинг.
+
+    Аргументы:
+        pages: Асинхронный итератор пар (номер страницы, HTML-код). Вместо HTML-кода
+            может передаваться готовый список записей - он пропускается без парсинга.
+        executor: Пул процессов парсинга (None - поток по умолчанию).
+        engine (str): Движок извлечения.
+        queue_size (int): Максимальное количество страниц в очереди.
+
+    Возвращает:
+        AsyncIterator[tuple]: Номер страницы и список записей о товарах (Product).
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=max(1, queue_size))
+
+    async def feed():
+        cancelled = False
+        try:
+            async with aclosing(pages) as source:
+                async for page_num, html in source:
+                    if isinstance(html, list):
+                        future = loop.create_future()
+                        future.set_result((None, html))
+                    else:
+                        future = loop.run_in_executor(executor, _parse_page_timed, html, engine)
+                    await queue.put((page_num, future))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # Отменяет подачу только остановившийся потребитель: очередь больше никто не читает,
+            # и ожидание места для признака конца в заполненной очереди не завершилось бы
+            if not cancelled:
+                await queue.put(None)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while (item := await queue.get()) is not None:
+            page_num, future = item
+            seconds, records = await future
+            if seconds is not None:
+                metrics.observe("parse", seconds)
+            yield page_num, [Product.from_record(record) for record in records]
+        await feeder
+    finally:
+        if not feeder.done():
+            feeder.cancel()
+            await asyncio.gather(feeder, return_exceptions=True)
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                item[1].cancel()
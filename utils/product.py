@@ -0,0 +1,154 @@
+"""
+Модуль записи о товаре.
+Этот модуль:
+- Описывает товар компактной записью Product (dataclass со __slots__) с типизированными полями:
+  артикул и отзывы - целые числа, цена - целое число копеек, рейтинг - дробное число,
+  отсутствующие значения - None.
+- Преобразует текстовые значения карточки товара (артикул, цена с символом рубля и тонкими пробелами,
+  рейтинг, отзывы) в числа.
+- Хранит дополнительные поля (данные детальной страницы, статус, категория) в отдельном словаре,
+  который создается только у товаров с такими полями.
+- Преобразует товар в кортеж основных полей и обратно для журнала и передачи между процессами.
+"""
+
+import re
+from dataclasses import dataclass, replace
+
+# Названия основных столбцов для пользователя в порядке полей записи
+PRODUCT_FIELDS = ("Артикул", "Название", "URL", "Цена", "Рейтинг", "Отзывы")
+
+_DIGITS_RE = re.compile(r'\d+')
+_PRICE_RE = re.compile(r'(\d+)(?:[.,](\d{1,2}))?')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def parse_code(text):
+    """
+    Артикул из текста карточки ("Код: 12345678").
+
+    Аргументы:
+        text (str): Текст с артикулом или None.
+
+    Возвращает:
+        int: Артикул или None, если цифр нет.
+    """
+    match = _DIGITS_RE.search(text) if text else None
+    return int(match.group()) if match else None
+
+
+def parse_price(text):
+    """
+    Цена в копейках из текста ("12 490 ₽", "1 249,90 ₽"). Пробелы, в том числе
+    неразрывные и тонкие, не учитываются.
+
+    Аргументы:
+        text (str): Текст цены или None.
+
+    Возвращает:
+        int: Цена в копейках или None, если цена не указана.
+    """
+    match = _PRICE_RE.search(_SPACES_RE.sub("", text)) if text else None
+    if not match:
+        return None
+    rubles, kopecks = match.groups()
+    return int(rubles) * 100 + int((kopecks or "0").ljust(2, "0"))
+
+
+def parse_rating(value):
+    """
+    Аргументы:
+        value (str): Значение рейтинга или None.
+
+    Возвращает:
+        float: Рейтинг, округленный до сотых, или None.
+    """
+    try:
+        return round(float(value), 2) if value is not None else None
+    except ValueError:
+        return None
+
+
+def parse_reviews(text):
+    """
+    Аргументы:
+        text (str): Текст с количеством отзывов или None.
+
+    Возвращает:
+        int: Количество отзывов или None, если текст не является числом.
+    """
+    text = text.strip() if text else ""
+    return int(text) if text.isdigit() else None
+
+
+@dataclass(slots=True)
+class Product:
+    """
+    Товар со страницы категории. Цена хранится в копейках, чтобы не терять точность.
+    """
+    code: int | None = None
+    name: str | None = None
+    url: str | None = None
+    price: int | None = None
+    rating: float | None = None
+    reviews: int | None = None
+    extra: dict | None = None
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Аргументы:
+            record (tuple): Значения основных полей в порядке PRODUCT_FIELDS.
+
+        Возвращает:
+            Product: Товар.
+        """
+        return cls(*record)
+
+    def record(self):
+        """
+        Возвращает:
+            tuple: Значения основных полей в порядке PRODUCT_FIELDS.
+        """
+        return (self.code, self.name, self.url, self.price, self.rating, self.reviews)
+
+    @property
+    def price_rubles(self):
+        return self.price / 100 if self.price is not None else None
+
+    def row(self, extra_fields=()):
+        """
+        Значения для выходного файла.
+
+        Аргументы:
+            extra_fields (tuple): Дополнительные поля, добавляемые в конец строки.
+
+        Возвращает:
+            tuple: Основные поля в порядке PRODUCT_FIELDS (цена в рублях), затем дополнительные поля.
+        """
+        return (
+            self.code, self.name, self.url, self.price_rubles, self.rating, self.reviews,
+        ) + tuple(self.get(field) for field in extra_fields)
+
+    def get(self, field):
+        """
+        Значение дополнительного поля.
+
+        Аргументы:
+            field (str): Название поля.
+
+        Возвращает:
+            Значение поля или None, если оно не задано.
+        """
+        return self.extra.get(field) if self.extra else None
+
+    def with_extra(self, fields):
+        """
+        Копия товара с добавленными дополнительными полями.
+
+        Аргументы:
+            fields (dict): Название поля -> значение.
+
+        Возвращает:
+            Product: Новый товар; исходный не изменяется.
+        """
+        return replace(self, extra={**self.extra, **fields} if self.extra else dict(fields))
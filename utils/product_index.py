@@ -0,0 +1,193 @@
+"""
+Модуль постоянного индекса товаров для инкрементального (дельта) парсинга.
+Этот модуль:
+- Хранит в SQLite последнее состояние каждого товара по артикулу и хеш его цены, рейтинга и отзывов.
+- Определяет для каждого спарсенного товара статус: новый, изменившийся или без изменений.
+- Находит товары категории, пропавшие с сайта после полного обхода.
+- Ведет таблицу истории цен.
+- Фиксирует изменения одной транзакцией в конце успешного запуска, чтобы прерванный
+  запуск можно было повторить или продолжить без потери изменений.
+- Позволяет нескольким категориям параллельно использовать один файл индекса.
+"""
+
+import hashlib
+import sqlite3
+import time
+from utils.product import Product, parse_price, parse_rating, parse_reviews
+from utils.logger import logger
+
+STATUS_FIELD = "Статус"
+STATUS_NEW = "новый"
+STATUS_CHANGED = "изменен"
+STATUS_REMOVED = "удален"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    code TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    name TEXT,
+    url TEXT,
+    price TEXT,
+    rating TEXT,
+    reviews TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS products_category ON products (category, active, last_seen);
+CREATE TABLE IF NOT EXISTS price_history (
+    code TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    price TEXT,
+    rating TEXT,
+    reviews TEXT
+);
+CREATE INDEX IF NOT EXISTS price_history_code ON price_history (code, seen_at);
+"""
+
+UPSERT_SQL = (
+    "INSERT INTO products (code, category, hash, name, url, price, rating, reviews, first_seen, last_seen) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(code) DO UPDATE SET category = excluded.category, hash = excluded.hash, "
+    "name = excluded.name, url = excluded.url, price = excluded.price, rating = excluded.rating, "
+    "reviews = excluded.reviews, last_seen = excluded.last_seen, active = 1"
+)
+
+
+def _stored_price(value):
+    # Цена хранится в копейках; индекс предыдущих версий хранил исходный текст цены ("12 490 ₽")
+    if value is None:
+        return None
+    return int(value) if value.isdigit() else parse_price(value)
+
+
+def product_hash(product):
+    """
+    Хеш отслеживаемых полей товара: цены, рейтинга и отзывов.
+
+    Аргументы:
+        product (Product): Данные о товаре.
+
+    Возвращает:
+        str: Хеш.
+    """
+    key = f"{product.price}|{product.rating}|{product.reviews}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class ProductIndex:
+    """
+    Индекс товаров одной категории для одного запуска парсинга.
+    Изменения накапливаются в памяти и записываются одной короткой транзакцией в commit(),
+    поэтому несколько категорий могут параллельно работать с одним файлом индекса.
+    """
+    def __init__(self, path, category):
+        self.path = path
+        self.category = category
+        self.run_started = time.time()
+        self.counts = {STATUS_NEW: 0, STATUS_CHANGED: 0, STATUS_REMOVED: 0, "без изменений": 0, "без артикула": 0}
+        self._seen = {}
+        self._history = []
+        self._removed = []
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def diff(self, products):
+        """
+        Сравнение товаров страницы с индексом.
+
+        Аргументы:
+            products (list): Список записей о товарах (Product).
+
+        Возвращает:
+            list: Только новые и изменившиеся товары с заполненным полем "Статус".
+        """
+        changed = []
+        for product in products:
+            code = product.code
+            if code is None:
+                self.counts["без артикула"] += 1
+                continue
+            new_hash = product_hash(product)
+            if code in self._seen:
+                row = (self._seen[code][2], 1)
+            else:
+                row = self._conn.execute("SELECT hash, active FROM products WHERE code = ?", (code,)).fetchone()
+            if row is None or not row[1]:
+                status = STATUS_NEW
+            elif row[0] != new_hash:
+                status = STATUS_CHANGED
+            else:
+                status = None
+
+            self._seen[code] = self._row(product, new_hash)
+            if status is None:
+                self.counts["без изменений"] += 1
+                continue
+            self._history.append((code, self.run_started, product.price, product.rating, product.reviews))
+            self.counts[status] += 1
+            changed.append(product.with_extra({STATUS_FIELD: status}))
+        return changed
+
+    def mark_seen(self, products):
+        """
+        Отметка товаров категории, которые не сравниваются и не записываются: повторов, уже выгруженных
+        прошлыми запусками или другими категориями пакета. Без отметки removed() счел бы их пропавшими.
+
+        Аргументы:
+            products (list): Список записей о товарах (Product).
+        """
+        for product in products:
+            if product.code is not None and product.code not in self._seen:
+                self._seen[product.code] = self._row(product, product_hash(product))
+
+    def _row(self, product, new_hash):
+        return (
+            product.code, self.category, new_hash, product.name, product.url, product.price,
+            product.rating, product.reviews, self.run_started, self.run_started,
+        )
+
+    def removed(self):
+        """
+        Поиск товаров категории, не встретившихся в текущем запуске.
+        Вызывается только после полного обхода категории; при фиксации найденные товары помечаются неактивными.
+
+        Возвращает:
+            list: Пропавшие товары с полем "Статус".
+        """
+        rows = self._conn.execute(
+            "SELECT code, name, url, price, rating, reviews FROM products WHERE category = ? AND active = 1",
+            (self.category,),
+        ).fetchall()
+        # Столбцы индекса текстовые: артикул и числовые поля читаются строками
+        rows = [row for row in rows if int(row[0]) not in self._seen]
+        self._removed = [(row[0],) for row in rows]
+        self.counts[STATUS_REMOVED] = len(rows)
+        return [
+            Product(
+                int(code), name, url, _stored_price(price), parse_rating(rating), parse_reviews(reviews),
+                {STATUS_FIELD: STATUS_REMOVED},
+            )
+            for code, name, url, price, rating, reviews in rows
+        ]
+
+    def commit(self):
+        """
+        Запись изменений запуска в индекс одной транзакцией.
+        """
+        with self._conn:
+            self._conn.executemany(UPSERT_SQL, self._seen.values())
+            self._conn.executemany(
+                "INSERT INTO price_history (code, seen_at, price, rating, reviews) VALUES (?, ?, ?, ?, ?)",
+                self._history,
+            )
+            self._conn.executemany("UPDATE products SET active = 0 WHERE code = ?", self._removed)
+        logger.info("Изменения товаров: " + ", ".join(f"{name} {count}" for name, count in self.counts.items()))
+
+    def close(self):
+        """
+        Закрытие индекса. Незафиксированные изменения прерванного запуска отбрасываются.
+        """
+        self._conn.close()
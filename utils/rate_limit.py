@@ -0,0 +1,119 @@
+"""
+Модуль ограничения частоты и параллельности запросов.
+Этот модуль:
+- Ограничивает общую частоту запросов алгоритмом token bucket.
+- Подстраивает частоту под сайт (AIMD): плавно повышает ее при быстрых ответах и резко снижает
+  при ответах 429/5xx, страницах защиты от ботов и росте задержки ответа.
+- Ограничивает количество одновременных запросов к одному хосту.
+- Используется пулом загрузки, общим для нескольких категорий.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+from utils.logger import logger
+
+MIN_RATE = 0.2
+RATE_INCREASE = 0.1  # Прирост частоты (запросов в секунду) после каждого быстрого ответа
+LATENCY_FACTOR = 3.0  # Допустимая задержка относительно минимальной наблюдавшейся
+MIN_TARGET_LATENCY = 1.0
+DECREASE_INTERVAL = 1.0  # Серия одновременных ошибок снижает частоту один раз
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов (token bucket).
+    """
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        if self._updated is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """
+        Ожидание разрешения на один запрос.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            self._refill(loop.time())
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill(loop.time())
+            self._tokens -= 1
+
+    def record_success(self, latency):
+        """
+        Учет успешного ответа. Фиксированный ограничитель его не использует.
+
+        Аргументы:
+            latency (float): Задержка ответа в секундах.
+        """
+
+    def record_blocked(self):
+        """
+        Учет ответа, которым сайт ограничивает запросы. Фиксированный ограничитель его не использует.
+        """
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Ограничитель частоты, подстраивающийся под сайт по схеме AIMD:
+    частота растет на increase после каждого быстрого ответа, снижается вдвое при блокировке
+    и на 20%, если сглаженная задержка ответа превышает целевую.
+    """
+    def __init__(self, rate, min_rate=MIN_RATE, max_rate=None, increase=RATE_INCREASE, target_latency=None):
+        super().__init__(rate)
+        self.min_rate = min(min_rate, rate)
+        self.max_rate = max_rate or rate * 4
+        self.increase = increase
+        self.target_latency = target_latency
+        self.latency = None
+        self._min_latency = None
+        self._decreased_at = 0.0
+
+    def record_success(self, latency):
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self._min_latency = latency if self._min_latency is None else min(self._min_latency, latency)
+        target = self.target_latency or max(LATENCY_FACTOR * self._min_latency, MIN_TARGET_LATENCY)
+        if self.latency > target:
+            self._decrease(0.8, f"задержка ответа {self.latency:.1f} с")
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_blocked(self):
+        # Запросы, уже разрешенные запасом токенов, тоже откладываются
+        self._tokens = min(self._tokens, 0.0)
+        self._decrease(0.5, "сайт ограничивает запросы")
+
+    def _decrease(self, factor, reason):
+        now = time.monotonic()
+        if now - self._decreased_at < DECREASE_INTERVAL:
+            return
+        self._decreased_at = now
+        old_rate = self.rate
+        self.rate = max(self.min_rate, self.rate * factor)
+        logger.warning(f"Частота запросов снижена: {old_rate:.2f} -> {self.rate:.2f} запр/с ({reason})")
+
+
+class HostLimiter:
+    """
+    Ограничитель количества одновременных запросов к одному хосту.
+    """
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphores = {}
+
+    @asynccontextmanager
+    async def slot(self, url):
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.limit))
+        async with semaphore:
+            yield
@@ -2,26 +2,89 @@
 Модуль для настройки браузера Selenium.
 Этот модуль:
 - Инициализирует headless-браузер Chrome с реалистичным user-agent.
-- Использует webdriver-manager для автоматической установки ChromeDriver.
+- Определяет путь к ChromeDriver один раз: из переменной CHROMEDRIVER_PATH, из сохраненного пути
+  или через webdriver-manager, и запоминает его для следующих запусков. Если сохраненный ChromeDriver
+  не подходит к обновившемуся Chrome, путь определяется через webdriver-manager заново.
+- По умолчанию блокирует загрузку изображений, шрифтов и CSS: парсеру нужна только разметка карточек.
 - Возвращает объект WebDriver для использования в парсинге.
 - Минимизирует логирование, выводя только ключевые сообщения.
 """
 
 import os
+import threading
+from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import SessionNotCreatedException
 from webdriver_manager.chrome import ChromeDriverManager
 from utils.logger import logger
 
 # Отключаем логирование webdriver-manager
 os.environ["WDM_LOG"] = "0"
 
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
 
-def setup_browser():
+# Файл с путем к ChromeDriver, найденным при предыдущих запусках
+DRIVER_PATH_FILE = Path.home() / ".cache" / "vseinstrumenti-parser" / "chromedriver_path"
+
+# Ресурсы, не нужные для чтения разметки карточек товаров
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.css",
+]
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path(stale_path=None):
+    """
+    Определение пути к ChromeDriver. Выполняется один раз за процесс,
+    webdriver-manager вызывается, только если сохраненный путь недоступен или устарел.
+
+    Аргументы:
+        stale_path (str): Путь, с которым не удалось запустить браузер. Он отбрасывается,
+            и ChromeDriver устанавливается через webdriver-manager заново.
+
+    Возвращает:
+        str: Путь к исполняемому файлу ChromeDriver.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        # Другой поток уже заменил устаревший путь
+        if _driver_path and _driver_path != stale_path and os.path.exists(_driver_path):
+            return _driver_path
+        path = os.environ.get("CHROMEDRIVER_PATH")
+        if not path:
+            try:
+                path = DRIVER_PATH_FILE.read_text(encoding="utf-8").strip()
+            except OSError:
+                path = None
+            if path == stale_path:
+                path = None
+        if not path or not os.path.exists(path):
+            logger.info("Установка ChromeDriver")
+            path = ChromeDriverManager().install()
+            try:
+                DRIVER_PATH_FILE.parent.mkdir(parents=True, exist_ok=True)
+                DRIVER_PATH_FILE.write_text(path, encoding="utf-8")
+            except OSError as e:
+                logger.warning(f"Не удалось сохранить путь к ChromeDriver: {str(e)}")
+        _driver_path = path
+        return path
+
+
+def setup_browser(block_resources=True):
     """
     Настройка экземпляра браузера Selenium.
 
+    Аргументы:
+        block_resources (bool): Блокировать загрузку изображений, шрифтов и CSS.
+
     Возвращает:
         WebDriver: Объект браузера Selenium.
     """
@@ -32,13 +95,26 @@ def setup_browser():
         options.add_argument("--disable-gpu")
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
-        options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
+        options.add_argument(f"user-agent={USER_AGENT}")
         options.add_argument("--log-level=3")  # Минимизируем логи ChromeDriver
-        service = Service(ChromeDriverManager().install(), log_output=os.devnull)
-        driver = webdriver.Chrome(service=service, options=options)
+        # Не ждем загрузки всех ресурсов: готовность страницы определяется по карточкам товаров
+        options.page_load_strategy = "eager"
+        if block_resources:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        driver_path = resolve_driver_path()
+        try:
+            driver = webdriver.Chrome(service=Service(driver_path, log_output=os.devnull), options=options)
+        except SessionNotCreatedException as e:
+            # Сохраненный ChromeDriver мог устареть после обновления Chrome: устанавливаем подходящий и повторяем
+            if os.environ.get("CHROMEDRIVER_PATH"):
+                raise
+            logger.warning(f"Не удалось запустить Chrome с {driver_path}, повторная установка ChromeDriver: {str(e)}")
+            driver_path = resolve_driver_path(stale_path=driver_path)
+            driver = webdriver.Chrome(service=Service(driver_path, log_output=os.devnull), options=options)
+        if block_resources:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
         logger.info("Selenium успешно запущен")
         return driver
     except Exception as e:
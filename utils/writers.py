@@ -0,0 +1,197 @@
+"""
+Модуль с форматами выходных файлов.
+Этот модуль:
+- Выбирает формат записи по расширению файла или явно заданному формату.
+- Потоково записывает товары в CSV, JSONL и Parquet с типизированными столбцами:
+  артикул и отзывы - целые числа, цена (в рублях) и рейтинг - дробные, отсутствующие значения - пустые.
+- Сопоставляет поля записи о товаре (utils.product.Product) с английскими именами столбцов.
+- Использует Excel (utils.excel_creator) как один из форматов со столбцами на русском языке.
+"""
+
+import csv
+import json
+from pathlib import Path
+from utils.excel_creator import ExcelStreamWriter
+from utils.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+TYPED_FIELDS = ("code", "name", "url", "price", "rating", "reviews")
+# Имена дополнительных столбцов в типизированных форматах
+TYPED_NAMES = {
+    "Статус": "status",
+    "Категория": "category",
+    "Бренд": "brand",
+    "Наличие": "availability",
+    "Остаток": "stock",
+    "Характеристики": "specs",
+}
+# Дополнительные столбцы с целыми значениями (остальные - строки)
+INT_EXTRA_NAMES = {"stock"}
+PARQUET_ROW_GROUP = 50_000
+
+
+class ProductWriter:
+    """
+    Базовый класс потоковой записи товаров. Используется как контекстный менеджер.
+    """
+    def __init__(self, filename, extra_fields=()):
+        self.filename = filename
+        self.extra_fields = tuple(extra_fields)
+        self.fields = TYPED_FIELDS + tuple(TYPED_NAMES.get(field, field) for field in self.extra_fields)
+        self.rows_written = 0
+
+    def write_rows(self, products):
+        """
+        Добавление товаров в файл.
+
+        Аргументы:
+            products (list): Список записей о товарах (Product).
+        """
+        self._write_records([product.row(self.extra_fields) for product in products])
+        self.rows_written += len(products)
+
+    def _write_records(self, records):
+        raise NotImplementedError
+
+    def close(self):
+        logger.info(f"Файл сохранен: {self.filename}, строк: {self.rows_written}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvWriter(ProductWriter):
+    """
+    Запись в CSV. Каждая страница сбрасывается на диск сразу после записи.
+    """
+    def __init__(self, filename, extra_fields=()):
+        super().__init__(filename, extra_fields)
+        self._file = open(filename, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.fields)
+
+    def _write_records(self, records):
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            super().close()
+
+
+class JsonlWriter(ProductWriter):
+    """
+    Запись в JSON Lines: один объект товара на строку.
+    """
+    def __init__(self, filename, extra_fields=()):
+        super().__init__(filename, extra_fields)
+        self._file = open(filename, "w", encoding="utf-8")
+
+    def _write_records(self, records):
+        self._file.writelines(
+            json.dumps(dict(zip(self.fields, record)), ensure_ascii=False) + "\n" for record in records
+        )
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            super().close()
+
+
+class ParquetWriter(ProductWriter):
+    """
+    Запись в Parquet. Записи накапливаются в группы строк по PARQUET_ROW_GROUP.
+    """
+    def __init__(self, filename, extra_fields=()):
+        if pa is None:
+            raise ValueError("Для записи Parquet требуется пакет pyarrow")
+        super().__init__(filename, extra_fields)
+        self.schema = pa.schema([
+            ("code", pa.int64()),
+            ("name", pa.string()),
+            ("url", pa.string()),
+            ("price", pa.float64()),
+            ("rating", pa.float64()),
+            ("reviews", pa.int64()),
+        ] + [
+            (field, pa.int64() if field in INT_EXTRA_NAMES else pa.string())
+            for field in self.fields[len(TYPED_FIELDS):]
+        ])
+        self._writer = pq.ParquetWriter(filename, self.schema, compression="zstd")
+        self._buffer = []
+
+    def _write_records(self, records):
+        self._buffer.extend(records)
+        if len(self._buffer) >= PARQUET_ROW_GROUP:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            columns = list(zip(*self._buffer))
+            self._writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, self.schema)],
+                schema=self.schema,
+            ))
+            self._buffer = []
+
+    def close(self):
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+            super().close()
+
+
+WRITERS = {
+    "xlsx": ExcelStreamWriter,
+    "csv": CsvWriter,
+    "jsonl": JsonlWriter,
+    "parquet": ParquetWriter,
+}
+
+
+def resolve_format(filename, output_format=None):
+    """
+    Определение формата выходного файла.
+
+    Аргументы:
+        filename (str): Имя выходного файла.
+        output_format (str): Явно заданный формат (None - по расширению файла).
+
+    Возвращает:
+        str: Формат файла.
+
+    Исключения:
+        ValueError: Если формат не поддерживается.
+    """
+    output_format = (output_format or Path(filename).suffix.lstrip(".") or "xlsx").lower()
+    if output_format == "json":
+        output_format = "jsonl"
+    if output_format not in WRITERS:
+        raise ValueError(f"Неподдерживаемый формат файла: {output_format}")
+    return output_format
+
+
+def create_writer(filename, output_format=None, extra_fields=()):
+    """
+    Создание объекта потоковой записи для выходного файла.
+
+    Аргументы:
+        filename (str): Имя выходного файла.
+        output_format (str): Формат: "xlsx", "csv", "jsonl" или "parquet" (None - по расширению).
+        extra_fields (tuple): Дополнительные поля товара после основных столбцов.
+
+    Возвращает:
+        Объект с методами write_rows(products) и close().
+    """
+    return WRITERS[resolve_format(filename, output_format)](filename, extra_fields)